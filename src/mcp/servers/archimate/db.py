@@ -3,111 +3,225 @@
 from __future__ import annotations
 
 import json
+import queue
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 DATA_DIR = Path(__file__).parent / "data"
 DB_PATH = DATA_DIR / "archimate_3_2.sqlite"
 
-
-ELEMENTS: list[dict[str, str]] = [
-    {"name": "Resource", "layer": "Strategy", "aspect": "Passive Structure", "definition": "An asset owned or controlled by an organization."},
-    {"name": "Capability", "layer": "Strategy", "aspect": "Behavior", "definition": "An ability that an active structure element possesses."},
-    {"name": "Value Stream", "layer": "Strategy", "aspect": "Behavior", "definition": "A sequence of activities that creates an overall result for a customer or stakeholder."},
-    {"name": "Course of Action", "layer": "Strategy", "aspect": "Active Structure", "definition": "An approach or plan for configuring capabilities and resources."},
-    {"name": "Business Actor", "layer": "Business", "aspect": "Active Structure", "definition": "An organizational entity capable of performing behavior."},
-    {"name": "Business Role", "layer": "Business", "aspect": "Active Structure", "definition": "The responsibility for performing specific behavior."},
-    {"name": "Business Collaboration", "layer": "Business", "aspect": "Active Structure", "definition": "An aggregate of two or more business internal active structure elements."},
-    {"name": "Business Interface", "layer": "Business", "aspect": "Active Structure", "definition": "A point of access where business services are made available."},
-    {"name": "Business Process", "layer": "Business", "aspect": "Behavior", "definition": "A sequence of business behaviors that achieves a specific result."},
-    {"name": "Business Function", "layer": "Business", "aspect": "Behavior", "definition": "A collection of business behavior based on a chosen set of criteria."},
-    {"name": "Business Interaction", "layer": "Business", "aspect": "Behavior", "definition": "A unit of behavior performed by a collaboration of two or more roles."},
-    {"name": "Business Event", "layer": "Business", "aspect": "Behavior", "definition": "A business behavior element that denotes a state change."},
-    {"name": "Business Service", "layer": "Business", "aspect": "Behavior", "definition": "Explicitly defined business behavior exposed to the environment."},
-    {"name": "Business Object", "layer": "Business", "aspect": "Passive Structure", "definition": "A concept used within a particular business domain."},
-    {"name": "Contract", "layer": "Business", "aspect": "Passive Structure", "definition": "A formal or informal specification of an agreement."},
-    {"name": "Representation", "layer": "Business", "aspect": "Passive Structure", "definition": "A perceptible form of the information carried by a business object."},
-    {"name": "Product", "layer": "Business", "aspect": "Composite", "definition": "A coherent collection of services and associated contract/value offered as a whole."},
-    {"name": "Application Component", "layer": "Application", "aspect": "Active Structure", "definition": "A modular, deployable, and replaceable part of a software system."},
-    {"name": "Application Collaboration", "layer": "Application", "aspect": "Active Structure", "definition": "An aggregate of two or more application components that work together."},
-    {"name": "Application Interface", "layer": "Application", "aspect": "Active Structure", "definition": "A point of access where application services are made available."},
-    {"name": "Application Function", "layer": "Application", "aspect": "Behavior", "definition": "Automated behavior that can be performed by an application component."},
-    {"name": "Application Interaction", "layer": "Application", "aspect": "Behavior", "definition": "A unit of collective application behavior performed by a collaboration."},
-    {"name": "Application Process", "layer": "Application", "aspect": "Behavior", "definition": "A sequence of application behavior that achieves a specific result."},
-    {"name": "Application Event", "layer": "Application", "aspect": "Behavior", "definition": "An application behavior element that denotes a state change."},
-    {"name": "Application Service", "layer": "Application", "aspect": "Behavior", "definition": "An explicitly defined exposed application behavior."},
-    {"name": "Data Object", "layer": "Application", "aspect": "Passive Structure", "definition": "Data suitable for automated processing."},
-    {"name": "Node", "layer": "Technology", "aspect": "Active Structure", "definition": "A computational or physical resource that hosts software or artifacts."},
-    {"name": "Device", "layer": "Technology", "aspect": "Active Structure", "definition": "A physical IT resource upon which artifacts can be deployed."},
-    {"name": "System Software", "layer": "Technology", "aspect": "Active Structure", "definition": "A software environment for specific types of components and objects."},
-    {"name": "Technology Collaboration", "layer": "Technology", "aspect": "Active Structure", "definition": "An aggregate of two or more internal active structure technology elements."},
-    {"name": "Technology Interface", "layer": "Technology", "aspect": "Active Structure", "definition": "A point of access where technology services are made available."},
-    {"name": "Path", "layer": "Technology", "aspect": "Active Structure", "definition": "A link between two or more nodes through which data or material can flow."},
-    {"name": "Communication Network", "layer": "Technology", "aspect": "Active Structure", "definition": "A set of structures that connects nodes for transmission."},
-    {"name": "Technology Function", "layer": "Technology", "aspect": "Behavior", "definition": "A collection of technology behavior based on a chosen set of criteria."},
-    {"name": "Technology Process", "layer": "Technology", "aspect": "Behavior", "definition": "A sequence of technology behavior that achieves a specific result."},
-    {"name": "Technology Interaction", "layer": "Technology", "aspect": "Behavior", "definition": "A unit of collective technology behavior performed by collaboration."},
-    {"name": "Technology Event", "layer": "Technology", "aspect": "Behavior", "definition": "A technology behavior element that denotes a state change."},
-    {"name": "Technology Service", "layer": "Technology", "aspect": "Behavior", "definition": "An explicitly defined exposed technology behavior."},
-    {"name": "Artifact", "layer": "Technology", "aspect": "Passive Structure", "definition": "A physical piece of data that can be used or produced in development/deployment."},
-    {"name": "Equipment", "layer": "Physical", "aspect": "Active Structure", "definition": "One or more physical machines, tools, or instruments."},
-    {"name": "Facility", "layer": "Physical", "aspect": "Active Structure", "definition": "A physical structure or environment."},
-    {"name": "Distribution Network", "layer": "Physical", "aspect": "Active Structure", "definition": "A physical network used to transport materials or energy."},
-    {"name": "Material", "layer": "Physical", "aspect": "Passive Structure", "definition": "Tangible physical matter or energy."},
-    {"name": "Stakeholder", "layer": "Motivation", "aspect": "Motivation", "definition": "A role of an individual, team, or organization representing interests."},
-    {"name": "Driver", "layer": "Motivation", "aspect": "Motivation", "definition": "An internal or external condition that motivates change."},
-    {"name": "Assessment", "layer": "Motivation", "aspect": "Motivation", "definition": "The outcome of an analysis of a state of affairs."},
-    {"name": "Goal", "layer": "Motivation", "aspect": "Motivation", "definition": "A high-level statement of intent, direction, or desired end state."},
-    {"name": "Outcome", "layer": "Motivation", "aspect": "Motivation", "definition": "An end result produced by behavior or capabilities."},
-    {"name": "Principle", "layer": "Motivation", "aspect": "Motivation", "definition": "A qualitative statement of intent to guide behavior and design."},
-    {"name": "Requirement", "layer": "Motivation", "aspect": "Motivation", "definition": "A statement of need that must be realized by a system."},
-    {"name": "Constraint", "layer": "Motivation", "aspect": "Motivation", "definition": "A restriction on how a system is realized or behavior is performed."},
-    {"name": "Meaning", "layer": "Motivation", "aspect": "Motivation", "definition": "The knowledge or expertise present in a concept."},
-    {"name": "Value", "layer": "Motivation", "aspect": "Motivation", "definition": "The relative worth, utility, or importance of a concept."},
-    {"name": "Work Package", "layer": "Implementation & Migration", "aspect": "Behavior", "definition": "A series of actions identified and designed to achieve specific results."},
-    {"name": "Deliverable", "layer": "Implementation & Migration", "aspect": "Passive Structure", "definition": "A precisely-defined outcome of a work package."},
-    {"name": "Implementation Event", "layer": "Implementation & Migration", "aspect": "Behavior", "definition": "A state change related to implementation or migration."},
-    {"name": "Plateau", "layer": "Implementation & Migration", "aspect": "Passive Structure", "definition": "A relatively stable state of architecture at a point in time."},
-    {"name": "Gap", "layer": "Implementation & Migration", "aspect": "Passive Structure", "definition": "A statement of difference between two plateaus."},
-    {"name": "Location", "layer": "Cross-Layer", "aspect": "Composite", "definition": "A conceptual or physical place where structure elements can be assigned."},
-    {"name": "Grouping", "layer": "Cross-Layer", "aspect": "Composite", "definition": "An arbitrary aggregation of concepts for convenience."},
-    {"name": "Junction", "layer": "Cross-Layer", "aspect": "Relationship Connector", "definition": "A connector used to model logical AND/OR combinations of relationships."},
-]
-
-
-RELATIONSHIPS: list[dict[str, object]] = [
-    {"name": "Composition", "category": "Structural", "directed": 1, "definition": "Indicates that an element consists of one or more other concepts.", "constraints": ["Strong whole-part relation", "Part typically has one composite"]},
-    {"name": "Aggregation", "category": "Structural", "directed": 1, "definition": "Indicates that an element groups one or more other concepts.", "constraints": ["Weak whole-part relation"]},
-    {"name": "Assignment", "category": "Structural", "directed": 1, "definition": "Links active structure elements to behavior they perform, own, or are responsible for.", "constraints": ["Commonly between active structure and behavior"]},
-    {"name": "Realization", "category": "Structural", "directed": 1, "definition": "Indicates that one concept makes another concept real.", "constraints": ["From concrete/implementation to abstract/specification"]},
-    {"name": "Serving", "category": "Dependency", "directed": 1, "definition": "Indicates that an element provides functionality to another element.", "constraints": ["Also known as Used-By inverse"]},
-    {"name": "Access", "category": "Dependency", "directed": 1, "definition": "Indicates ability of behavior/active elements to read and/or write passive structure elements.", "constraints": ["Access type is read, write, or readwrite"]},
-    {"name": "Influence", "category": "Dependency", "directed": 1, "definition": "Indicates that an element affects implementation or achievement of another element.", "constraints": ["Influence strength can be qualitative or quantitative"]},
-    {"name": "Triggering", "category": "Dynamic", "directed": 1, "definition": "Indicates temporal or causal precedence between elements.", "constraints": ["Often between behavior and events/behavior"]},
-    {"name": "Flow", "category": "Dynamic", "directed": 1, "definition": "Indicates transfer from one element to another.", "constraints": ["Can represent information, value, or material transfer"]},
-    {"name": "Specialization", "category": "Other", "directed": 1, "definition": "Indicates that one element is a more specific form of another.", "constraints": ["Inherits properties from generic element"]},
-    {"name": "Association", "category": "Other", "directed": 0, "definition": "A generic relationship between elements not covered by other relation types.", "constraints": ["May be directed or undirected"]},
-]
-
-
-RULES: list[dict[str, str]] = [
-    {"rule_type": "layering", "source": "Business", "relationship": "Serving", "target": "Application", "notes": "Application services may serve business behavior/elements."},
-    {"rule_type": "layering", "source": "Application", "relationship": "Serving", "target": "Technology", "notes": "Technology services may serve application behavior/elements."},
-    {"rule_type": "structural", "source": "Active Structure", "relationship": "Assignment", "target": "Behavior", "notes": "Active structure elements can be assigned to behavior."},
-    {"rule_type": "structural", "source": "Behavior", "relationship": "Access", "target": "Passive Structure", "notes": "Behavior can access passive structure elements."},
-    {"rule_type": "motivation", "source": "Driver", "relationship": "Influence", "target": "Goal", "notes": "Drivers can influence goals and requirements."},
-    {"rule_type": "implementation", "source": "Work Package", "relationship": "Realization", "target": "Deliverable", "notes": "Work packages realize deliverables."},
-]
-
-
-def get_connection() -> sqlite3.Connection:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+# bump _SCHEMA_REVISION whenever init_db's DDL or seed data changes
+_METAMODEL_VERSION = "3.2"
+_SCHEMA_REVISION = "3"
+_INITIALIZED = False
+_INIT_LOCK = threading.Lock()
+# bumped on every metamodel write so callers can key caches of derived results on it
+_GENERATION = 0
+
+# per-connection tuning; WAL lets readers proceed while a write commits
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# SQLite allows a single writer at a time: one long-lived writer guarded by a
+# lock, plus a small pool of read-only connections that never wait on it
+_WRITER: sqlite3.Connection | None = None
+_WRITE_LOCK = threading.Lock()
+_READER_POOL_SIZE = 4
+_READERS: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=_READER_POOL_SIZE)
+
+
+def _configure(connection: sqlite3.Connection) -> sqlite3.Connection:
+    for pragma in _CONNECTION_PRAGMAS:
+        connection.execute(pragma)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def _writer() -> sqlite3.Connection:
+    """Return the writer connection, creating the file and enabling WAL on first use; hold ``_WRITE_LOCK``."""
+    global _WRITER
+    if _WRITER is None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(
+            f"{DB_PATH.as_uri()}?mode=rwc",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=256,
+            isolation_level=None,
+        )
+        # journal_mode is persisted in the database file; readers inherit it
+        connection.execute("PRAGMA journal_mode=WAL")
+        _WRITER = _configure(connection)
+    return _WRITER
+
+
+def _open_reader() -> sqlite3.Connection:
+    if _WRITER is None:
+        # a read-only connection cannot create the file or switch it to WAL
+        with _WRITE_LOCK:
+            _writer()
+    connection = sqlite3.connect(
+        f"{DB_PATH.as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        cached_statements=256,
+        isolation_level=None,
+    )
+    # mode=ro already refuses writes at the file level; query_only also rejects them before planning
+    connection.execute("PRAGMA query_only=ON")
+    return _configure(connection)
+
+
+@contextmanager
+def _borrow(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """Use the writer inside one BEGIN IMMEDIATE transaction, or borrow a pooled reader."""
+    if write:
+        with _WRITE_LOCK:
+            connection = _writer()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        return
+
+    try:
+        connection = _READERS.get_nowait()
+    except queue.Empty:
+        connection = _open_reader()
+    try:
+        yield connection
+    finally:
+        try:
+            _READERS.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+
+def _acquire(write: bool = False) -> AbstractContextManager[sqlite3.Connection]:
+    """Like ``_borrow``, but runs ``init_db`` first if this process has not done so yet."""
+    if not _INITIALIZED:
+        init_db()
+    return _borrow(write)
+
+
+def get_connection() -> AbstractContextManager[sqlite3.Connection]:
+    """Borrow a pooled read-only connection; use as ``with get_connection() as connection:``."""
+    return _acquire()
+
+
+def _where_variants(prefix: str, clauses: tuple[str, ...], suffix: str = "") -> tuple[str, ...]:
+    """Pre-build one SQL string per subset of ``clauses``; bit ``i`` of the index enables ``clauses[i]``."""
+    variants = []
+    for mask in range(1 << len(clauses)):
+        active = [clause for bit, clause in enumerate(clauses) if mask >> bit & 1]
+        where = " WHERE " + " AND ".join(active) if active else ""
+        variants.append(prefix + where + suffix)
+    return tuple(variants)
+
+
+# every optional-filter combination is a fixed string, so identical shapes hit
+# sqlite3's per-connection statement cache; mask 0 of the DELETE tables is never used
+_GET_ANN_DEFAULT_LIMIT = 100
+_GET_ANN_MAX_LIMIT = 500
+_GET_ANN_SELECT = "SELECT id, target_type, target_name, note, source, created_at FROM metamodel_annotations"
+_GET_ANN_FILTERS = ("target_type = ? COLLATE NOCASE", "target_name = ? COLLATE NOCASE")
+_GET_ANN_SQL = _where_variants(_GET_ANN_SELECT, _GET_ANN_FILTERS, " ORDER BY created_at DESC, id DESC LIMIT ?")
+# the default limit is baked in, so the common call binds no LIMIT parameter
+_GET_ANN_SQL_DEFAULT = _where_variants(
+    _GET_ANN_SELECT, _GET_ANN_FILTERS, f" ORDER BY created_at DESC, id DESC LIMIT {_GET_ANN_DEFAULT_LIMIT}"
+)
+_DELETE_ANN_SQL = _where_variants(
+    "DELETE FROM metamodel_annotations",
+    ("target_type = ? COLLATE NOCASE", "target_name = ? COLLATE NOCASE", "note = ?", "source = ? COLLATE NOCASE"),
+)
+_DELETE_RULE_SQL = _where_variants(
+    "DELETE FROM metamodel_rules",
+    (
+        "rule_type = ? COLLATE NOCASE",
+        "source = ? COLLATE NOCASE",
+        "relationship = ? COLLATE NOCASE",
+        "target = ? COLLATE NOCASE",
+        "notes = ?",
+    ),
+)
+
+
+_ELEMENTS_DDL = """
+CREATE TABLE IF NOT EXISTS elements (
+    name TEXT PRIMARY KEY COLLATE NOCASE,
+    layer TEXT NOT NULL,
+    aspect TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    attributes_json TEXT NOT NULL,
+    constraints_json TEXT NOT NULL
+)
+"""
+
+_RELATIONSHIPS_DDL = """
+CREATE TABLE IF NOT EXISTS relationships (
+    name TEXT PRIMARY KEY COLLATE NOCASE,
+    category TEXT NOT NULL,
+    directed INTEGER NOT NULL,
+    definition TEXT NOT NULL,
+    attributes_json TEXT NOT NULL,
+    constraints_json TEXT NOT NULL
+)
+"""
+
+
+def _ensure_nocase_table(cursor: sqlite3.Cursor, table: str, ddl: str) -> None:
+    """Create ``table`` or rebuild a pre-NOCASE copy so its name key is case-insensitive."""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    row = cursor.fetchone()
+    if row is not None and "COLLATE NOCASE" not in row[0].upper():
+        # one-shot migration; the first row wins where names differ only by case
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        cursor.execute(ddl)
+        cursor.execute(f"INSERT OR IGNORE INTO {table} SELECT * FROM {table}_legacy ORDER BY rowid")
+        cursor.execute(f"DROP TABLE {table}_legacy")
+        return
+    cursor.execute(ddl)
+
+
+def _is_current(connection: sqlite3.Connection) -> bool:
+    try:
+        rows = dict(
+            connection.execute(
+                "SELECT key, value FROM metamodel_info WHERE key IN ('version', 'schema_revision')"
+            ).fetchall()
+        )
+    except sqlite3.OperationalError:
+        return False
+    return rows.get("version") == _METAMODEL_VERSION and rows.get("schema_revision") == _SCHEMA_REVISION
 
 
 def init_db() -> None:
-    with get_connection() as connection:
+    """Create, migrate or seed the metamodel tables once per process; also run lazily by ``_acquire``."""
+    with _INIT_LOCK:
+        if not _INITIALIZED:
+            _init_db()
+
+
+def _init_db() -> None:
+    global _INITIALIZED
+    with _borrow() as connection:
+        if _is_current(connection):
+            _INITIALIZED = True
+            return
+    with _borrow(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute(
             """
@@ -117,30 +231,8 @@ def init_db() -> None:
             )
             """
         )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS elements (
-                name TEXT PRIMARY KEY,
-                layer TEXT NOT NULL,
-                aspect TEXT NOT NULL,
-                definition TEXT NOT NULL,
-                attributes_json TEXT NOT NULL,
-                constraints_json TEXT NOT NULL
-            )
-            """
-        )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS relationships (
-                name TEXT PRIMARY KEY,
-                category TEXT NOT NULL,
-                directed INTEGER NOT NULL,
-                definition TEXT NOT NULL,
-                attributes_json TEXT NOT NULL,
-                constraints_json TEXT NOT NULL
-            )
-            """
-        )
+        _ensure_nocase_table(cursor, "elements", _ELEMENTS_DDL)
+        _ensure_nocase_table(cursor, "relationships", _RELATIONSHIPS_DDL)
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS metamodel_rules (
@@ -171,13 +263,33 @@ def init_db() -> None:
             ON metamodel_rules(rule_type, source, relationship, target, notes)
             """
         )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_ann_lookup
+            ON metamodel_annotations(target_type COLLATE NOCASE, target_name COLLATE NOCASE, created_at DESC, id DESC)
+            """
+        )
+        # superseded by idx_ann_lookup, which also covers the id tie-break of the ORDER BY
+        cursor.execute("DROP INDEX IF EXISTS idx_ann_type_name")
+        # equality filters of archimate_metamodel_info; names are already NOCASE primary keys
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_elements_layer ON elements(layer COLLATE NOCASE)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationships_category ON relationships(category COLLATE NOCASE)"
+        )
 
         cursor.execute(
             """
             INSERT OR REPLACE INTO metamodel_info(key, value)
             VALUES (?, ?)
             """,
-            ("version", "3.2"),
+            ("version", _METAMODEL_VERSION),
+        )
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO metamodel_info(key, value)
+            VALUES (?, ?)
+            """,
+            ("schema_revision", _SCHEMA_REVISION),
         )
         cursor.execute(
             """
@@ -187,48 +299,40 @@ def init_db() -> None:
             ("description", "ArchiMate metamodel reference dataset for MCP usage."),
         )
 
-        for element in ELEMENTS:
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO elements(name, layer, aspect, definition, attributes_json, constraints_json)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    element["name"],
-                    element["layer"],
-                    element["aspect"],
-                    element["definition"],
-                    json.dumps({"name": "string", "layer": "string", "aspect": "string", "definition": "string"}),
-                    json.dumps([]),
-                ),
-            )
+        from . import metamodel_seed
 
-        for relationship in RELATIONSHIPS:
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO relationships(name, category, directed, definition, attributes_json, constraints_json)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    relationship["name"],
-                    relationship["category"],
-                    relationship["directed"],
-                    relationship["definition"],
-                    json.dumps({"name": "string", "category": "string", "directed": "boolean", "definition": "string"}),
-                    json.dumps(relationship.get("constraints", [])),
-                ),
-            )
+        metamodel_seed.seed(cursor)
+    known_type_names.cache_clear()
+    element_layers.cache_clear()
+    _bump_generation()
+    _INITIALIZED = True
 
-        for rule in RULES:
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO metamodel_rules(rule_type, source, relationship, target, notes)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (rule["rule_type"], rule["source"], rule["relationship"], rule["target"], rule["notes"]),
-            )
 
-        connection.commit()
+def _bump_generation() -> None:
+    global _GENERATION
+    _GENERATION += 1
+
+
+def generation() -> int:
+    """Counter that changes whenever the metamodel tables are initialized or written."""
+    return _GENERATION
+
+
+@lru_cache(maxsize=2)
+def known_type_names(table: str) -> frozenset[str]:
+    """Lowercased names in ``elements`` or ``relationships``; cleared when an upsert adds a type."""
+    if table not in ("elements", "relationships"):
+        raise ValueError(f"Unknown metamodel table '{table}'")
+    with get_connection() as connection:
+        return frozenset(row[0].lower() for row in connection.execute(f"SELECT name FROM {table}"))
+
+
+@lru_cache(maxsize=1)
+def element_layers() -> MappingProxyType[str, str]:
+    """Read-only map of lowercased element type name to layer; cleared by every ``upsert_element``."""
+    with get_connection() as connection:
+        cursor = connection.execute("SELECT name, layer FROM elements")
+        return MappingProxyType({row[0].lower(): row[1] for row in cursor})
 
 
 def upsert_element(
@@ -239,26 +343,32 @@ def upsert_element(
     attributes: dict[str, Any] | None = None,
     constraints: list[Any] | None = None,
 ) -> str:
-    with get_connection() as connection:
+    with _acquire(write=True) as connection:
         cursor = connection.cursor()
-        cursor.execute("SELECT 1 FROM elements WHERE lower(name)=lower(?)", (name,))
-        exists = cursor.fetchone() is not None
+        attributes_json = json.dumps(attributes or {}, ensure_ascii=False)
+        constraints_json = json.dumps(constraints or [], ensure_ascii=False)
         cursor.execute(
             """
-            INSERT OR REPLACE INTO elements(name, layer, aspect, definition, attributes_json, constraints_json)
-            VALUES (?, ?, ?, ?, ?, ?)
+            UPDATE elements
+            SET layer=?, aspect=?, definition=?, attributes_json=?, constraints_json=?
+            WHERE name=?
             """,
-            (
-                name,
-                layer,
-                aspect,
-                definition,
-                json.dumps(attributes or {}, ensure_ascii=False),
-                json.dumps(constraints or [], ensure_ascii=False),
-            ),
+            (layer, aspect, definition, attributes_json, constraints_json, name),
         )
-        connection.commit()
-    return "updated" if exists else "created"
+        created = cursor.rowcount == 0
+        if created:
+            cursor.execute(
+                """
+                INSERT INTO elements(name, layer, aspect, definition, attributes_json, constraints_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (name, layer, aspect, definition, attributes_json, constraints_json),
+            )
+    if created:
+        known_type_names.cache_clear()
+    element_layers.cache_clear()
+    _bump_generation()
+    return "created" if created else "updated"
 
 
 def upsert_relationship(
@@ -269,54 +379,53 @@ def upsert_relationship(
     attributes: dict[str, Any] | None = None,
     constraints: list[Any] | None = None,
 ) -> str:
-    with get_connection() as connection:
+    with _acquire(write=True) as connection:
         cursor = connection.cursor()
-        cursor.execute("SELECT 1 FROM relationships WHERE lower(name)=lower(?)", (name,))
-        exists = cursor.fetchone() is not None
+        directed_flag = int(bool(directed))
+        attributes_json = json.dumps(attributes or {}, ensure_ascii=False)
+        constraints_json = json.dumps(constraints or [], ensure_ascii=False)
         cursor.execute(
             """
-            INSERT OR REPLACE INTO relationships(name, category, directed, definition, attributes_json, constraints_json)
-            VALUES (?, ?, ?, ?, ?, ?)
+            UPDATE relationships
+            SET category=?, directed=?, definition=?, attributes_json=?, constraints_json=?
+            WHERE name=?
             """,
-            (
-                name,
-                category,
-                int(bool(directed)),
-                definition,
-                json.dumps(attributes or {}, ensure_ascii=False),
-                json.dumps(constraints or [], ensure_ascii=False),
-            ),
+            (category, directed_flag, definition, attributes_json, constraints_json, name),
         )
-        connection.commit()
-    return "updated" if exists else "created"
+        created = cursor.rowcount == 0
+        if created:
+            cursor.execute(
+                """
+                INSERT INTO relationships(name, category, directed, definition, attributes_json, constraints_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (name, category, directed_flag, definition, attributes_json, constraints_json),
+            )
+    if created:
+        known_type_names.cache_clear()
+    _bump_generation()
+    return "created" if created else "updated"
 
 
 def add_rule(rule_type: str, source: str, relationship: str, target: str, notes: str) -> int:
-    with get_connection() as connection:
+    with _acquire(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute(
             """
-            INSERT OR IGNORE INTO metamodel_rules(rule_type, source, relationship, target, notes)
+            INSERT INTO metamodel_rules(rule_type, source, relationship, target, notes)
             VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(rule_type, source, relationship, target, notes) DO UPDATE SET notes=notes
+            RETURNING id
             """,
             (rule_type, source, relationship, target, notes),
         )
-        connection.commit()
-        if cursor.rowcount == 0:
-            cursor.execute(
-                """
-                SELECT id FROM metamodel_rules
-                WHERE rule_type=? AND source=? AND relationship=? AND target=? AND notes=?
-                """,
-                (rule_type, source, relationship, target, notes),
-            )
-            row = cursor.fetchone()
-            return int(row[0])
-        return int(cursor.lastrowid)
+        rule_id = int(cursor.fetchone()[0])
+    _bump_generation()
+    return rule_id
 
 
 def add_annotation(target_type: str, target_name: str, note: str, source: str = "user") -> int:
-    with get_connection() as connection:
+    with _acquire(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute(
             """
@@ -325,30 +434,35 @@ def add_annotation(target_type: str, target_name: str, note: str, source: str =
             """,
             (target_type, target_name, note, source),
         )
-        connection.commit()
         return int(cursor.lastrowid)
 
 
 def get_annotations(target_type: str | None = None, target_name: str | None = None, limit: int = 100) -> list[dict[str, Any]]:
-    limit = max(1, min(int(limit), 500))
-    with get_connection() as connection:
-        cursor = connection.cursor()
-        sql = "SELECT id, target_type, target_name, note, source, created_at FROM metamodel_annotations"
-        clauses = []
-        params: list[Any] = []
-        if target_type:
-            clauses.append("lower(target_type) = lower(?)")
-            params.append(target_type)
-        if target_name:
-            clauses.append("lower(target_name) = lower(?)")
-            params.append(target_name)
-        if clauses:
-            sql += " WHERE " + " AND ".join(clauses)
-        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    if limit is None or limit <= 0:
+        limit = _GET_ANN_DEFAULT_LIMIT
+    elif limit > _GET_ANN_MAX_LIMIT:
+        limit = _GET_ANN_MAX_LIMIT
+    params: list[Any] = [value for value in (target_type, target_name) if value]
+    mask = (1 if target_type else 0) | (2 if target_name else 0)
+    if limit == _GET_ANN_DEFAULT_LIMIT:
+        sql = _GET_ANN_SQL_DEFAULT[mask]
+    else:
+        sql = _GET_ANN_SQL[mask]
         params.append(limit)
+    with _acquire() as connection:
+        cursor = connection.cursor()
         cursor.execute(sql, params)
-        cols = [col[0] for col in cursor.description]
-        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+        return [
+            {
+                "id": row[0],
+                "target_type": row[1],
+                "target_name": row[2],
+                "note": row[3],
+                "source": row[4],
+                "created_at": row[5],
+            }
+            for row in cursor
+        ]
 
 
 def delete_annotation(
@@ -358,34 +472,18 @@ def delete_annotation(
     note: str | None = None,
     source: str | None = None,
 ) -> int:
-    with get_connection() as connection:
+    with _acquire(write=True) as connection:
         cursor = connection.cursor()
         if annotation_id is not None:
             cursor.execute("DELETE FROM metamodel_annotations WHERE id = ?", (int(annotation_id),))
-            connection.commit()
             return int(cursor.rowcount)
 
-        clauses = []
-        params: list[Any] = []
-        if target_type:
-            clauses.append("lower(target_type) = lower(?)")
-            params.append(target_type)
-        if target_name:
-            clauses.append("lower(target_name) = lower(?)")
-            params.append(target_name)
-        if note:
-            clauses.append("note = ?")
-            params.append(note)
-        if source:
-            clauses.append("lower(source) = lower(?)")
-            params.append(source)
-
-        if not clauses:
+        params: list[Any] = [value for value in (target_type, target_name, note, source) if value]
+        if not params:
             return 0
 
-        sql = "DELETE FROM metamodel_annotations WHERE " + " AND ".join(clauses)
-        cursor.execute(sql, params)
-        connection.commit()
+        mask = (1 if target_type else 0) | (2 if target_name else 0) | (4 if note else 0) | (8 if source else 0)
+        cursor.execute(_DELETE_ANN_SQL[mask], params)
         return int(cursor.rowcount)
 
 
@@ -397,35 +495,24 @@ def delete_rule(
     target: str | None = None,
     notes: str | None = None,
 ) -> int:
-    with get_connection() as connection:
+    with _acquire(write=True) as connection:
         cursor = connection.cursor()
         if rule_id is not None:
             cursor.execute("DELETE FROM metamodel_rules WHERE id = ?", (int(rule_id),))
-            connection.commit()
-            return int(cursor.rowcount)
-
-        clauses = []
-        params: list[Any] = []
-        if rule_type:
-            clauses.append("lower(rule_type) = lower(?)")
-            params.append(rule_type)
-        if source:
-            clauses.append("lower(source) = lower(?)")
-            params.append(source)
-        if relationship:
-            clauses.append("lower(relationship) = lower(?)")
-            params.append(relationship)
-        if target:
-            clauses.append("lower(target) = lower(?)")
-            params.append(target)
-        if notes:
-            clauses.append("notes = ?")
-            params.append(notes)
-
-        if not clauses:
-            return 0
-
-        sql = "DELETE FROM metamodel_rules WHERE " + " AND ".join(clauses)
-        cursor.execute(sql, params)
-        connection.commit()
-        return int(cursor.rowcount)
+            deleted = int(cursor.rowcount)
+        else:
+            params: list[Any] = [value for value in (rule_type, source, relationship, target, notes) if value]
+            if not params:
+                return 0
+
+            mask = (
+                (1 if rule_type else 0)
+                | (2 if source else 0)
+                | (4 if relationship else 0)
+                | (8 if target else 0)
+                | (16 if notes else 0)
+            )
+            cursor.execute(_DELETE_RULE_SQL[mask], params)
+            deleted = int(cursor.rowcount)
+    _bump_generation()
+    return deleted
@@ -5,35 +5,217 @@ from __future__ import annotations
 import csv
 import io
 import json
+import logging
+import secrets
 import sqlite3
-import uuid
+import threading
 import xml.etree.ElementTree as ET
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from itertools import islice
 from pathlib import Path
 from typing import Any
+from xml.sax.saxutils import escape
+
+from .db import element_layers, known_type_names
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+
+_LOG = logging.getLogger(__name__)
 
 EXPORTS_DIR = Path("/home/markus/Workspace/mcp_archi/exports")
 DATA_DIR = Path(__file__).parent / "data"
 MODEL_DB_PATH = DATA_DIR / "archimate_models.sqlite"
 
+# generated ids are 32 hex chars from the OS CSPRNG, like uuid4().hex without the UUID object
+_new_id = secrets.token_hex
+
+# a full snapshot is stored every N versions; versions in between only log their changes
+_CHECKPOINT_INTERVAL = 50
+
+# orjson is an optional speed-up; the stdlib encoder produces equivalent JSON
+if orjson is not None:
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+else:
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    _loads = json.loads
+
 
 class ModelError(Exception):
     """Domain-level error for model management operations."""
 
 
+# per-connection tuning for an embedded single-writer store
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA foreign_keys=ON",
+    # bounds the work of the ANALYZE run after bulk loads
+    "PRAGMA analysis_limit=1000",
+)
+_WAL_READY = False
+_INITIALIZED = False
+_INIT_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
 def get_connection() -> sqlite3.Connection:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(MODEL_DB_PATH)
+    """Return this thread's cached connection; ``with`` commits or rolls back but does not close it.
+
+    The schema is created by the first call in the process if ``init_model_db`` has not run yet.
+    """
+    if not _INITIALIZED:
+        init_model_db()
+    return _thread_connection()
+
+
+def _thread_connection() -> sqlite3.Connection:
+    global _WAL_READY
+    connection = getattr(_LOCAL, "connection", None)
+    if connection is None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        # transactions are only ever opened explicitly by _conn(write=True); with isolation_level=None the
+        # sqlite3 module never slips in an implicit deferred BEGIN in front of a write
+        connection = sqlite3.connect(MODEL_DB_PATH, check_same_thread=False, isolation_level=None)
+        if not _WAL_READY:
+            # journal_mode is persisted in the database file, so one switch is enough
+            connection.execute("PRAGMA journal_mode=WAL")
+            _WAL_READY = True
+        for pragma in _CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        connection.row_factory = sqlite3.Row
+        _LOCAL.connection = connection
+    return connection
+
+
+def _conn(write: bool = False) -> AbstractContextManager[sqlite3.Connection]:
+    """Yield this thread's connection; ``write=True`` wraps the block in BEGIN IMMEDIATE/COMMIT.
+
+    Blocks entered while a transaction is already open join it, so public functions can call
+    each other without committing their caller's work early.
+    """
+    return _transaction(get_connection(), write)
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection, write: bool) -> Iterator[sqlite3.Connection]:
+    if not write or connection.in_transaction:
+        yield connection
+        return
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.rollback()
+        raise
+    connection.commit()
+
+
+# text filter columns are NOCASE so type/name predicates can use the indexes directly
+_MODEL_ELEMENTS_DDL = """
+    CREATE TABLE IF NOT EXISTS model_elements (
+        model_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        type_name TEXT NOT NULL COLLATE NOCASE,
+        name TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+        attributes_json TEXT NOT NULL DEFAULT '{}',
+        valid_from TEXT,
+        valid_to TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        tags_json TEXT NOT NULL DEFAULT '{}',
+        PRIMARY KEY(model_id, id),
+        FOREIGN KEY(model_id) REFERENCES models(id) ON DELETE CASCADE
+    )
+"""
+
+_MODEL_RELATIONSHIPS_DDL = """
+    CREATE TABLE IF NOT EXISTS model_relationships (
+        model_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        type_name TEXT NOT NULL COLLATE NOCASE,
+        source_element_id TEXT NOT NULL,
+        target_element_id TEXT NOT NULL,
+        name TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+        attributes_json TEXT NOT NULL DEFAULT '{}',
+        valid_from TEXT,
+        valid_to TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        tags_json TEXT NOT NULL DEFAULT '{}',
+        PRIMARY KEY(model_id, id),
+        FOREIGN KEY(model_id) REFERENCES models(id) ON DELETE CASCADE,
+        FOREIGN KEY(model_id, source_element_id) REFERENCES model_elements(model_id, id) ON DELETE CASCADE,
+        FOREIGN KEY(model_id, target_element_id) REFERENCES model_elements(model_id, id) ON DELETE CASCADE
+    )
+"""
+
+
+def _ensure_table(cursor: sqlite3.Cursor, table: str, ddl: str, marker: str, keep: str) -> list[tuple[str, str]]:
+    """Create ``table``, or rebuild an existing copy whose schema lacks ``marker``.
+
+    Only rows matching the ``keep`` condition are carried over, so rows that would violate
+    constraints added since (e.g. orphans from before foreign keys were enforced) are dropped;
+    their ``(model_id, id)`` keys are returned so the caller can record the loss.
+    Indexes are recreated by ``init_model_db``.
+    """
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    row = cursor.fetchone()
+    if row is not None and marker not in row[0]:
+        # keep other tables' foreign keys pointing at ``table`` rather than at the renamed copy
+        cursor.execute("PRAGMA legacy_alter_table=ON")
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        cursor.execute("PRAGMA legacy_alter_table=OFF")
+        cursor.execute(ddl)
+        cursor.execute(f"PRAGMA table_info({table}_legacy)")
+        columns = ", ".join(col[1] for col in cursor.fetchall())
+        cursor.execute(f"SELECT model_id, id FROM {table}_legacy AS legacy WHERE NOT ({keep})")
+        dropped = [(row[0], row[1]) for row in cursor.fetchall()]
+        cursor.execute(f"INSERT INTO {table}({columns}) SELECT {columns} FROM {table}_legacy AS legacy WHERE {keep}")
+        cursor.execute(f"DROP TABLE {table}_legacy")
+        return dropped
+    cursor.execute(ddl)
+    return []
 
 
 def init_model_db() -> None:
-    with get_connection() as connection:
+    """Create or migrate the model store schema once per process; also run lazily by ``get_connection``."""
+    global _INITIALIZED
+    with _INIT_LOCK:
+        if _INITIALIZED:
+            return
+        _init_schema()
+        _INITIALIZED = True
+
+
+def _init_schema() -> None:
+    with _transaction(_thread_connection(), write=True) as connection:
         cursor = connection.cursor()
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS models (
                 id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT NOT NULL DEFAULT '',
+                name TEXT NOT NULL COLLATE NOCASE,
+                description TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
                 attributes_json TEXT NOT NULL DEFAULT '{}',
                 created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -56,41 +238,34 @@ def init_model_db() -> None:
             )
             """
         )
+        # per-version change log; model_versions.snapshot_json only holds periodic checkpoints
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS model_elements (
+            CREATE TABLE IF NOT EXISTS model_version_ops (
                 model_id TEXT NOT NULL,
-                id TEXT NOT NULL,
-                type_name TEXT NOT NULL,
-                name TEXT NOT NULL DEFAULT '',
-                attributes_json TEXT NOT NULL DEFAULT '{}',
-                valid_from TEXT,
-                valid_to TEXT,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY(model_id, id),
+                version INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                target TEXT NOT NULL,
+                payload_json TEXT,
+                PRIMARY KEY(model_id, version, seq),
                 FOREIGN KEY(model_id) REFERENCES models(id) ON DELETE CASCADE
             )
             """
         )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS model_relationships (
-                model_id TEXT NOT NULL,
-                id TEXT NOT NULL,
-                type_name TEXT NOT NULL,
-                source_element_id TEXT NOT NULL,
-                target_element_id TEXT NOT NULL,
-                name TEXT NOT NULL DEFAULT '',
-                attributes_json TEXT NOT NULL DEFAULT '{}',
-                valid_from TEXT,
-                valid_to TEXT,
-                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY(model_id, id),
-                FOREIGN KEY(model_id) REFERENCES models(id) ON DELETE CASCADE
-            )
-            """
+        orphan_elements = _ensure_table(
+            cursor, "model_elements", _MODEL_ELEMENTS_DDL, "COLLATE NOCASE", "model_id IN (SELECT id FROM models)"
+        )
+        # endpoints cascade from model_elements; relationships with a missing endpoint cannot be kept
+        dangling_relationships = _ensure_table(
+            cursor,
+            "model_relationships",
+            _MODEL_RELATIONSHIPS_DDL,
+            "REFERENCES model_elements",
+            "EXISTS (SELECT 1 FROM model_elements e"
+            " WHERE e.model_id = legacy.model_id AND e.id = legacy.source_element_id)"
+            " AND EXISTS (SELECT 1 FROM model_elements e"
+            " WHERE e.model_id = legacy.model_id AND e.id = legacy.target_element_id)",
         )
         # dictionary of allowed custom attributes per model
         cursor.execute(
@@ -107,15 +282,15 @@ def init_model_db() -> None:
             """
         )
         # --- schema migrations for tables that may already exist ---
-        for migration in (
-            "ALTER TABLE model_attribute_definitions ADD COLUMN is_tag INTEGER NOT NULL DEFAULT 0",
-            "ALTER TABLE model_elements ADD COLUMN tags_json TEXT NOT NULL DEFAULT '{}'",
-            "ALTER TABLE model_relationships ADD COLUMN tags_json TEXT NOT NULL DEFAULT '{}'",
+        # SQLite has no ADD COLUMN IF NOT EXISTS, so check the live schema first
+        for table, column, definition in (
+            ("model_attribute_definitions", "is_tag", "INTEGER NOT NULL DEFAULT 0"),
+            ("model_elements", "tags_json", "TEXT NOT NULL DEFAULT '{}'"),
+            ("model_relationships", "tags_json", "TEXT NOT NULL DEFAULT '{}'"),
         ):
-            try:
-                cursor.execute(migration)
-            except Exception:
-                pass  # column already exists; SQLite does not support IF NOT EXISTS on ALTER
+            cursor.execute(f"PRAGMA table_info({table})")
+            if column not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS model_locks (
@@ -126,23 +301,74 @@ def init_model_db() -> None:
             )
             """
         )
+        # (model_id, type_name) covers the report's per-type GROUP BY, so it never touches table rows
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_model_elements_type ON model_elements(model_id, type_name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_model_relationships_type ON model_relationships(model_id, type_name)")
-        connection.commit()
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_model_elements_name ON model_elements(model_id, name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rel_src ON model_relationships(model_id, source_element_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rel_tgt ON model_relationships(model_id, target_element_id)")
+        _record_dropped_rows(connection, orphan_elements, dangling_relationships)
+
+
+def _decode_json_column(raw: str) -> Any:
+    # most rows carry no attributes or tags, so the empty blob skips the decoder; every row still gets
+    # its own dict because callers are free to mutate what they are handed
+    if raw in ("", "{}"):
+        return {}
+    try:
+        return _loads(raw)
+    except json.JSONDecodeError:
+        return {}
+
+
+# columns handed back to callers and recorded in version snapshots
+_ELEMENT_COLUMNS = "id, type_name, name, attributes_json, tags_json, valid_from, valid_to"
+_RELATIONSHIP_COLUMNS = (
+    "id, type_name, source_element_id, target_element_id, name, attributes_json, tags_json, valid_from, valid_to"
+)
+_TABLE_COLUMNS = {"model_elements": _ELEMENT_COLUMNS, "model_relationships": _RELATIONSHIP_COLUMNS}
+
+
+def _filter_variants(prefix: str, clauses: tuple[str, ...], suffix: str) -> tuple[str, ...]:
+    """Pre-build one SQL string per subset of ``clauses``; bit ``i`` of the index ANDs in ``clauses[i]``."""
+    return tuple(
+        prefix + "".join(f" AND {clause}" for bit, clause in enumerate(clauses) if mask >> bit & 1) + suffix
+        for mask in range(1 << len(clauses))
+    )
+
+
+# listing filters are fixed strings per combination, so sqlite3's statement cache is hit
+_VALID_AT_FILTER = "(valid_from IS NULL OR valid_from <= ?) AND (valid_to IS NULL OR valid_to >= ?)"
+_LIST_ELEMENTS_SQL = _filter_variants(
+    f"SELECT {_ELEMENT_COLUMNS} FROM model_elements WHERE model_id = ?",
+    (
+        "type_name = ?",
+        "(id LIKE ? OR name LIKE ?)",
+        _VALID_AT_FILTER,
+        "json_extract(attributes_json, ?) IS NOT NULL",
+        "lower(CAST(json_extract(attributes_json, ?) AS TEXT)) = lower(?)",
+    ),
+    " ORDER BY id LIMIT ?",
+)
+_LIST_RELATIONSHIPS_SQL = _filter_variants(
+    f"SELECT {_RELATIONSHIP_COLUMNS} FROM model_relationships WHERE model_id = ?",
+    ("type_name = ?", "source_element_id = ?", "target_element_id = ?", _VALID_AT_FILTER),
+    " ORDER BY id LIMIT ?",
+)
 
 
 def _row_dicts(cursor) -> list[dict[str, Any]]:
-    cols = [col[0] for col in cursor.description]
+    keys = [col[0] for col in cursor.description]
+    plain = [key for key in keys if key not in ("attributes_json", "tags_json")]
+    has_attributes = "attributes_json" in keys
+    has_tags = "tags_json" in keys
     rows = []
-    for row in cursor.fetchall():
-        data = dict(zip(cols, row))
-        for json_key in ("attributes_json", "tags_json"):
-            if json_key in data and isinstance(data[json_key], str):
-                try:
-                    data[json_key.replace("_json", "")] = json.loads(data[json_key])
-                except json.JSONDecodeError:
-                    data[json_key.replace("_json", "")] = {}
-                del data[json_key]
+    for row in cursor:
+        data = {key: row[key] for key in plain}
+        if has_attributes:
+            data["attributes"] = _decode_json_column(row["attributes_json"])
+        if has_tags:
+            data["tags"] = _decode_json_column(row["tags_json"])
         rows.append(data)
     return rows
 
@@ -161,27 +387,26 @@ def _ensure_model_exists(connection, model_id: str) -> dict[str, Any]:
     return model
 
 
-def _ensure_expected_version(connection, model_id: str, expected_version: int | None) -> None:
+def _ensure_expected_version(model: dict[str, Any], expected_version: int | None) -> None:
+    """Check ``expected_version`` against the ``models`` row already fetched in this write transaction."""
     if expected_version is None:
         return
-    cursor = connection.cursor()
-    cursor.execute("SELECT current_version FROM models WHERE id = ?", (model_id,))
-    row = cursor.fetchone()
-    if not row:
-        raise ModelError(f"Model '{model_id}' not found")
-    current_version = int(row[0])
+    current_version = int(model["current_version"])
     if int(expected_version) != current_version:
         raise ModelError(
             f"Version conflict: expected {expected_version}, but current version is {current_version}"
         )
 
 
-def _snapshot(connection, model_id: str) -> dict[str, Any]:
-    model = _ensure_model_exists(connection, model_id)
+def _snapshot_for_known_model(connection, model: dict[str, Any]) -> dict[str, Any]:
+    """Snapshot the graph of ``model``, a ``models`` row the caller has already fetched."""
+    model_id = model["id"]
     cursor = connection.cursor()
-    cursor.execute("SELECT * FROM model_elements WHERE model_id = ? ORDER BY id", (model_id,))
+    cursor.execute(f"SELECT {_ELEMENT_COLUMNS} FROM model_elements WHERE model_id = ? ORDER BY id", (model_id,))
     elements = _row_dicts(cursor)
-    cursor.execute("SELECT * FROM model_relationships WHERE model_id = ? ORDER BY id", (model_id,))
+    cursor.execute(
+        f"SELECT {_RELATIONSHIP_COLUMNS} FROM model_relationships WHERE model_id = ? ORDER BY id", (model_id,)
+    )
     relationships = _row_dicts(cursor)
     return {
         "model": model,
@@ -190,15 +415,81 @@ def _snapshot(connection, model_id: str) -> dict[str, Any]:
     }
 
 
-def _create_version(connection, model_id: str, author: str, message: str) -> int:
+# snapshot rows rendered by SQLite's json_object(); stored attribute/tag JSON is embedded as-is
+# (invalid or empty text becomes {} just as _decode_json_column treats it)
+_JSON_COLUMN = "json(CASE WHEN json_valid({0}) THEN {0} ELSE '{{}}' END)"
+_ELEMENT_JSON_SQL = (
+    "SELECT json_object('id', id, 'type_name', type_name, 'name', name, 'valid_from', valid_from, "
+    f"'valid_to', valid_to, 'attributes', {_JSON_COLUMN.format('attributes_json')}, "
+    f"'tags', {_JSON_COLUMN.format('tags_json')}) "
+    "FROM model_elements WHERE model_id = ? ORDER BY id"
+)
+_RELATIONSHIP_JSON_SQL = (
+    "SELECT json_object('id', id, 'type_name', type_name, 'source_element_id', source_element_id, "
+    "'target_element_id', target_element_id, 'name', name, 'valid_from', valid_from, 'valid_to', valid_to, "
+    f"'attributes', {_JSON_COLUMN.format('attributes_json')}, 'tags', {_JSON_COLUMN.format('tags_json')}) "
+    "FROM model_relationships WHERE model_id = ? ORDER BY id"
+)
+
+
+def _stream_snapshot_json(connection, model: dict[str, Any], out: io.StringIO) -> None:
+    """Write the ``_snapshot_for_known_model`` JSON for ``model`` to ``out`` row by row."""
     cursor = connection.cursor()
-    cursor.execute("SELECT current_version FROM models WHERE id = ?", (model_id,))
-    row = cursor.fetchone()
-    if not row:
-        raise ModelError(f"Model '{model_id}' not found")
+    out.write('{"model":')
+    out.write(_dumps(model))
+    for key, sql in (("elements", _ELEMENT_JSON_SQL), ("relationships", _RELATIONSHIP_JSON_SQL)):
+        out.write(f',"{key}":[')
+        separator = ""
+        for (row_json,) in cursor.execute(sql, (model["id"],)):
+            out.write(separator)
+            out.write(row_json)
+            separator = ","
+        out.write("]")
+    out.write("}")
+
+
+def _fetch_row(connection, table: str, model_id: str, row_id: str) -> dict[str, Any]:
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT {_TABLE_COLUMNS[table]} FROM {table} WHERE model_id = ? AND id = ?", (model_id, row_id))
+    return _row_dicts(cursor)[0]
+
 
-    next_version = int(row[0]) + 1
-    snapshot_json = json.dumps(_snapshot(connection, model_id), ensure_ascii=False)
+def _refresh_statistics(connection) -> None:
+    """Re-ANALYZE the graph tables after a bulk load so the planner sees the new row distribution."""
+    connection.execute("ANALYZE model_elements")
+    connection.execute("ANALYZE model_relationships")
+
+
+def _create_version(
+    connection,
+    model_id: str,
+    author: str,
+    message: str,
+    ops: list[tuple[str, str, Any]] | None = None,
+    model: dict[str, Any] | None = None,
+) -> int:
+    """Record a new version from the ``(op, target, payload)`` changes made since the last one.
+
+    ``ops=None`` (bulk changes such as imports and reverts) stores a full checkpoint
+    snapshot instead, as does every ``_CHECKPOINT_INTERVAL``-th version so replay
+    in ``_load_snapshot`` stays bounded.
+
+    The current ``models`` row is read once, or taken from ``model`` when the caller
+    already holds it; either way it is brought up to date in place.
+    """
+    cursor = connection.cursor()
+    if model is None:
+        model = _ensure_model_exists(connection, model_id)
+
+    next_version = int(model["current_version"]) + 1
+    if ops is None or next_version % _CHECKPOINT_INTERVAL == 0:
+        buffer = io.StringIO()
+        _stream_snapshot_json(connection, model, buffer)
+        snapshot_json = buffer.getvalue()
+        ops = []
+    else:
+        snapshot_json = ""
+        ops = [("model", model_id, model), *ops]
 
     cursor.execute(
         """
@@ -207,17 +498,112 @@ def _create_version(connection, model_id: str, author: str, message: str) -> int
         """,
         (model_id, next_version, author or "system", message or "" , snapshot_json),
     )
+    cursor.executemany(
+        """
+        INSERT INTO model_version_ops(model_id, version, seq, op, target, payload_json)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (model_id, next_version, seq, op, target, None if payload is None else _dumps(payload))
+            for seq, (op, target, payload) in enumerate(ops)
+        ],
+    )
     cursor.execute(
         """
         UPDATE models
         SET current_version = ?, updated_at = CURRENT_TIMESTAMP
         WHERE id = ?
+        RETURNING updated_at
         """,
         (next_version, model_id),
     )
+    model["current_version"] = next_version
+    model["updated_at"] = cursor.fetchone()[0]
     return next_version
 
 
+def _record_dropped_rows(
+    connection, orphan_elements: list[tuple[str, str]], dangling_relationships: list[tuple[str, str]]
+) -> None:
+    """Make rows discarded by a schema rebuild visible instead of losing them silently.
+
+    Elements only drop when their model no longer exists, so they are logged.  Each model that
+    lost relationships with a missing endpoint also gets a version deleting them, so the loss
+    shows up in its history.
+    """
+    if orphan_elements:
+        _LOG.warning("schema upgrade dropped %d element(s) belonging to no existing model", len(orphan_elements))
+    by_model: dict[str, list[str]] = {}
+    for model_id, relationship_id in dangling_relationships:
+        by_model.setdefault(model_id, []).append(relationship_id)
+    for model_id, relationship_ids in by_model.items():
+        _LOG.warning(
+            "schema upgrade dropped %d relationship(s) with a missing endpoint from model %s: %s",
+            len(relationship_ids),
+            model_id,
+            ", ".join(relationship_ids),
+        )
+        if _get_model_row(connection, model_id) is None:
+            continue
+        _create_version(
+            connection,
+            model_id,
+            "system",
+            f"Schema upgrade dropped {len(relationship_ids)} relationship(s) with a missing endpoint",
+            [("delete_relationship", relationship_id, None) for relationship_id in relationship_ids],
+        )
+
+
+def _load_snapshot(connection, model_id: str, version: int) -> dict[str, Any]:
+    """Rebuild the snapshot of ``version`` from the nearest checkpoint plus the change log."""
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT version, snapshot_json FROM model_versions
+        WHERE model_id = ? AND version <= ? AND snapshot_json != ''
+        ORDER BY version DESC
+        LIMIT 1
+        """,
+        (model_id, version),
+    )
+    checkpoint_version, snapshot_json = cursor.fetchone()
+    snapshot = _loads(snapshot_json)
+    model = snapshot["model"]
+    elements = {element["id"]: element for element in snapshot["elements"]}
+    relationships = {relationship["id"]: relationship for relationship in snapshot["relationships"]}
+
+    cursor.execute(
+        """
+        SELECT op, target, payload_json FROM model_version_ops
+        WHERE model_id = ? AND version > ? AND version <= ?
+        ORDER BY version, seq
+        """,
+        (model_id, checkpoint_version, version),
+    )
+    for op, target, payload_json in cursor.fetchall():
+        if op == "model":
+            model = _loads(payload_json)
+        elif op == "upsert_element":
+            elements[target] = _loads(payload_json)
+        elif op == "delete_element":
+            elements.pop(target, None)
+            relationships = {
+                rel_id: relationship
+                for rel_id, relationship in relationships.items()
+                if target not in (relationship["source_element_id"], relationship["target_element_id"])
+            }
+        elif op == "upsert_relationship":
+            relationships[target] = _loads(payload_json)
+        elif op == "delete_relationship":
+            relationships.pop(target, None)
+
+    return {
+        "model": model,
+        "elements": [elements[key] for key in sorted(elements)],
+        "relationships": [relationships[key] for key in sorted(relationships)],
+    }
+
+
 def create_model(
     name: str,
     description: str = "",
@@ -225,8 +611,8 @@ def create_model(
     model_id: str | None = None,
     author: str = "system",
 ) -> dict[str, Any]:
-    model_id = model_id or str(uuid.uuid4())
-    with get_connection() as connection:
+    model_id = model_id or _new_id(16)
+    with _conn(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute("SELECT 1 FROM models WHERE id = ?", (model_id,))
         if cursor.fetchone():
@@ -236,23 +622,24 @@ def create_model(
             """
             INSERT INTO models(id, name, description, attributes_json)
             VALUES (?, ?, ?, ?)
+            RETURNING *
             """,
-            (model_id, name, description, json.dumps(attributes or {}, ensure_ascii=False)),
+            (model_id, name, description, _dumps(attributes or {})),
         )
-        version = _create_version(connection, model_id, author, "Model created")
-        connection.commit()
+        model = _row_dicts(cursor)[0]
+        version = _create_version(connection, model_id, author, "Model created", model=model)
 
-        return get_model(model_id, include_graph=False) | {"version": version}
+        return model | {"version": version}
 
 
 def list_models(limit: int = 100, search: str | None = None) -> list[dict[str, Any]]:
     limit = max(1, min(int(limit), 500))
-    with get_connection() as connection:
+    with _conn() as connection:
         cursor = connection.cursor()
         sql = "SELECT * FROM models"
         params: list[Any] = []
         if search:
-            sql += " WHERE lower(name) LIKE lower(?) OR lower(description) LIKE lower(?)"
+            sql += " WHERE name LIKE ? OR description LIKE ?"
             like = f"%{search}%"
             params.extend([like, like])
         sql += " ORDER BY updated_at DESC LIMIT ?"
@@ -261,12 +648,30 @@ def list_models(limit: int = 100, search: str | None = None) -> list[dict[str, A
         return _row_dicts(cursor)
 
 
+_LIST_MODEL_NAMES_SQL = "SELECT id, name FROM models ORDER BY updated_at DESC LIMIT ?"
+_SEARCH_MODEL_NAMES_SQL = (
+    "SELECT id, name FROM models WHERE name LIKE ? OR description LIKE ? ORDER BY updated_at DESC LIMIT ?"
+)
+
+
+def list_models_names(limit: int = 50, search: str | None = None) -> list[tuple[str, str]]:
+    """``(id, name)`` pairs matching ``list_models``' filter and order, without the other columns."""
+    limit = max(1, min(int(limit), 500))
+    with _conn() as connection:
+        if search:
+            like = f"%{search}%"
+            rows = connection.execute(_SEARCH_MODEL_NAMES_SQL, (like, like, limit))
+        else:
+            rows = connection.execute(_LIST_MODEL_NAMES_SQL, (limit,))
+        return [(row[0], row[1]) for row in rows]
+
+
 def get_model(model_id: str, include_graph: bool = True) -> dict[str, Any]:
-    with get_connection() as connection:
+    with _conn() as connection:
         model = _ensure_model_exists(connection, model_id)
         if not include_graph:
             return model
-        snapshot = _snapshot(connection, model_id)
+        snapshot = _snapshot_for_known_model(connection, model)
         return {
             **model,
             "elements": snapshot["elements"],
@@ -283,9 +688,9 @@ def update_model(
     author: str = "system",
     message: str = "Model updated",
 ) -> dict[str, Any]:
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
 
         fields = []
         params: list[Any] = []
@@ -297,24 +702,24 @@ def update_model(
             params.append(description)
         if attributes is not None:
             fields.append("attributes_json = ?")
-            params.append(json.dumps(attributes, ensure_ascii=False))
+            params.append(_dumps(attributes))
 
         if fields:
             fields.append("updated_at = CURRENT_TIMESTAMP")
-            sql = "UPDATE models SET " + ", ".join(fields) + " WHERE id = ?"
+            sql = "UPDATE models SET " + ", ".join(fields) + " WHERE id = ? RETURNING *"
             params.append(model_id)
-            connection.cursor().execute(sql, params)
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            model = _row_dicts(cursor)[0]
 
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
-        return get_model(model_id, include_graph=False) | {"version": version}
+        version = _create_version(connection, model_id, author, message, [], model=model)
+        return model | {"version": version}
 
 
 def delete_model(model_id: str) -> int:
-    with get_connection() as connection:
+    with _conn(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute("DELETE FROM models WHERE id = ?", (model_id,))
-        connection.commit()
         return int(cursor.rowcount)
 
 
@@ -330,44 +735,122 @@ def upsert_model_element(
     author: str = "system",
     message: str = "Element upserted",
 ) -> dict[str, Any]:
-    element_id = element_id or str(uuid.uuid4())
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    element_id = element_id or _new_id(16)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
 
         cursor = connection.cursor()
-        cursor.execute("SELECT 1 FROM model_elements WHERE model_id = ? AND id = ?", (model_id, element_id))
-        exists = cursor.fetchone() is not None
+        attributes_json = _dumps(attributes or {})
+        # tags_json and created_at keep their existing values on the update path
         cursor.execute(
             """
-            INSERT OR REPLACE INTO model_elements(model_id, id, type_name, name, attributes_json, tags_json, valid_from, valid_to, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, COALESCE((SELECT tags_json FROM model_elements WHERE model_id=? AND id=?), '{}'), ?, ?, COALESCE((SELECT created_at FROM model_elements WHERE model_id=? AND id=?), CURRENT_TIMESTAMP), CURRENT_TIMESTAMP)
+            INSERT INTO model_elements(model_id, id, type_name, name, attributes_json, valid_from, valid_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(model_id, id) DO NOTHING
+            RETURNING 1
             """,
-            (
-                model_id,
-                element_id,
-                type_name,
-                name,
-                json.dumps(attributes or {}, ensure_ascii=False),
-                model_id,
-                element_id,
-                valid_from,
-                valid_to,
-                model_id,
-                element_id,
-            ),
+            (model_id, element_id, type_name, name, attributes_json, valid_from, valid_to),
+        )
+        created = cursor.fetchone() is not None
+        if not created:
+            cursor.execute(
+                """
+                UPDATE model_elements
+                SET type_name = ?, name = ?, attributes_json = ?, valid_from = ?, valid_to = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE model_id = ? AND id = ?
+                """,
+                (type_name, name, attributes_json, valid_from, valid_to, model_id, element_id),
+            )
+        row = _fetch_row(connection, "model_elements", model_id, element_id)
+        version = _create_version(
+            connection, model_id, author, message, [("upsert_element", element_id, row)], model=model
         )
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
 
         return {
-            "status": "updated" if exists else "created",
+            "status": "created" if created else "updated",
             "model_id": model_id,
             "element_id": element_id,
             "version": version,
         }
 
 
+# shared by the bulk upserts and the CSV/XML imports; rows are updated in place rather than REPLACEd, since
+# a REPLACE deletes the old row (cascading an element's relationships away) and drops its tags and created_at
+_UPSERT_ELEMENT_SQL = """
+    INSERT INTO model_elements(model_id, id, type_name, name, attributes_json, valid_from, valid_to)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(model_id, id) DO UPDATE SET
+        type_name = excluded.type_name, name = excluded.name, attributes_json = excluded.attributes_json,
+        valid_from = excluded.valid_from, valid_to = excluded.valid_to, updated_at = CURRENT_TIMESTAMP
+"""
+_UPSERT_RELATIONSHIP_SQL = """
+    INSERT INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, valid_from, valid_to)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(model_id, id) DO UPDATE SET
+        type_name = excluded.type_name, source_element_id = excluded.source_element_id,
+        target_element_id = excluded.target_element_id, name = excluded.name,
+        attributes_json = excluded.attributes_json, valid_from = excluded.valid_from,
+        valid_to = excluded.valid_to, updated_at = CURRENT_TIMESTAMP
+"""
+# rows per executemany call when an import is written in chunks
+_IMPORT_BATCH_SIZE = 1000
+
+
+def _ensure_elements_exist(cursor, model_id: str, element_ids: set[str]) -> None:
+    """Raise ``ModelError`` naming the first of ``element_ids`` missing from the model, in one query."""
+    cursor.execute(
+        """
+        SELECT value FROM json_each(?)
+        WHERE NOT EXISTS (SELECT 1 FROM model_elements WHERE model_id = ? AND id = value)
+        LIMIT 1
+        """,
+        (_dumps(sorted(element_ids)), model_id),
+    )
+    missing = cursor.fetchone()
+    if missing is not None:
+        raise ModelError(f"Element '{missing[0]}' not found in model '{model_id}'")
+
+
+def bulk_upsert_elements(
+    model_id: str,
+    elements: list[dict[str, Any]],
+    expected_version: int | None = None,
+    author: str = "system",
+    message: str = "Elements bulk upserted",
+) -> dict[str, Any]:
+    """Upsert many elements with one ``executemany`` and record a single version for all of them."""
+    rows = []
+    for position, element in enumerate(elements):
+        if not element.get("type_name"):
+            raise ModelError(f"Element at index {position} is missing 'type_name'")
+        rows.append(
+            (
+                model_id,
+                str(element.get("id") or _new_id(16)),
+                str(element["type_name"]),
+                str(element.get("name") or ""),
+                _dumps(element.get("attributes") or {}),
+                element.get("valid_from"),
+                element.get("valid_to"),
+            )
+        )
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
+        connection.executemany(_UPSERT_ELEMENT_SQL, rows)
+        _refresh_statistics(connection)
+        version = _create_version(connection, model_id, author, message, model=model)
+        return {
+            "status": "upserted",
+            "model_id": model_id,
+            "count": len(rows),
+            "element_ids": [row[1] for row in rows],
+            "version": version,
+        }
+
+
 def delete_model_element(
     model_id: str,
     element_id: str,
@@ -375,20 +858,29 @@ def delete_model_element(
     author: str = "system",
     message: str = "Element deleted",
 ) -> dict[str, Any]:
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
 
         cursor = connection.cursor()
-        cursor.execute("DELETE FROM model_relationships WHERE model_id = ? AND (source_element_id = ? OR target_element_id = ?)", (model_id, element_id, element_id))
-        rel_deleted = int(cursor.rowcount)
+        # incident relationships go with the element via ON DELETE CASCADE; count them first for the result.
+        # OR of two full conjunctions so each side can probe idx_rel_src / idx_rel_tgt
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM model_relationships
+            WHERE (model_id = ? AND source_element_id = ?) OR (model_id = ? AND target_element_id = ?)
+            """,
+            (model_id, element_id, model_id, element_id),
+        )
+        rel_deleted = int(cursor.fetchone()[0])
         cursor.execute("DELETE FROM model_elements WHERE model_id = ? AND id = ?", (model_id, element_id))
         elem_deleted = int(cursor.rowcount)
         if elem_deleted == 0:
             raise ModelError(f"Element '{element_id}' not found in model '{model_id}'")
 
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
+        version = _create_version(
+            connection, model_id, author, message, [("delete_element", element_id, None)], model=model
+        )
         return {
             "status": "deleted",
             "model_id": model_id,
@@ -404,26 +896,36 @@ def list_model_elements(
     search: str | None = None,
     valid_at: str | None = None,
     limit: int = 200,
+    attribute_key: str | None = None,
+    attribute_value: Any = None,
 ) -> list[dict[str, Any]]:
     limit = max(1, min(int(limit), 1000))
-    with get_connection() as connection:
+    with _conn() as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
-        sql = "SELECT * FROM model_elements WHERE model_id = ?"
         params: list[Any] = [model_id]
         if type_name:
-            sql += " AND lower(type_name)=lower(?)"
             params.append(type_name)
         if search:
-            sql += " AND (lower(id) LIKE lower(?) OR lower(name) LIKE lower(?))"
             like = f"%{search}%"
             params.extend([like, like])
         if valid_at:
-            sql += " AND (valid_from IS NULL OR valid_from <= ?) AND (valid_to IS NULL OR valid_to >= ?)"
             params.extend([valid_at, valid_at])
-        sql += " ORDER BY id LIMIT ?"
+        # the attribute is read by SQLite's json_extract; rows are never decoded just to be filtered
+        has_value = bool(attribute_key) and attribute_value is not None
+        if attribute_key:
+            params.append(f"$.{attribute_key}")
+            if has_value:
+                params.extend([f"$.{attribute_key}", str(attribute_value)])
         params.append(limit)
-        cursor.execute(sql, params)
+        mask = (
+            (1 if type_name else 0)
+            | (2 if search else 0)
+            | (4 if valid_at else 0)
+            | (8 if attribute_key else 0)
+            | (16 if has_value else 0)
+        )
+        cursor.execute(_LIST_ELEMENTS_SQL[mask], params)
         return _row_dicts(cursor)
 
 
@@ -441,25 +943,32 @@ def upsert_model_relationship(
     author: str = "system",
     message: str = "Relationship upserted",
 ) -> dict[str, Any]:
-    relationship_id = relationship_id or str(uuid.uuid4())
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    relationship_id = relationship_id or _new_id(16)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
 
         cursor = connection.cursor()
-        cursor.execute("SELECT 1 FROM model_elements WHERE model_id=? AND id=?", (model_id, source_element_id))
-        if cursor.fetchone() is None:
+        cursor.execute(
+            """
+            SELECT EXISTS(SELECT 1 FROM model_elements WHERE model_id = ? AND id = ?),
+                   EXISTS(SELECT 1 FROM model_elements WHERE model_id = ? AND id = ?)
+            """,
+            (model_id, source_element_id, model_id, target_element_id),
+        )
+        source_exists, target_exists = cursor.fetchone()
+        if not source_exists:
             raise ModelError(f"Source element '{source_element_id}' not found in model '{model_id}'")
-        cursor.execute("SELECT 1 FROM model_elements WHERE model_id=? AND id=?", (model_id, target_element_id))
-        if cursor.fetchone() is None:
+        if not target_exists:
             raise ModelError(f"Target element '{target_element_id}' not found in model '{model_id}'")
 
-        cursor.execute("SELECT 1 FROM model_relationships WHERE model_id = ? AND id = ?", (model_id, relationship_id))
-        exists = cursor.fetchone() is not None
+        attributes_json = _dumps(attributes or {})
         cursor.execute(
             """
-            INSERT OR REPLACE INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, tags_json, valid_from, valid_to, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT tags_json FROM model_relationships WHERE model_id=? AND id=?), '{}'), ?, ?, COALESCE((SELECT created_at FROM model_relationships WHERE model_id=? AND id=?), CURRENT_TIMESTAMP), CURRENT_TIMESTAMP)
+            INSERT INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, valid_from, valid_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(model_id, id) DO NOTHING
+            RETURNING 1
             """,
             (
                 model_id,
@@ -468,26 +977,88 @@ def upsert_model_relationship(
                 source_element_id,
                 target_element_id,
                 name,
-                json.dumps(attributes or {}, ensure_ascii=False),
-                model_id,
-                relationship_id,
+                attributes_json,
                 valid_from,
                 valid_to,
-                model_id,
-                relationship_id,
             ),
         )
+        created = cursor.fetchone() is not None
+        if not created:
+            cursor.execute(
+                """
+                UPDATE model_relationships
+                SET type_name = ?, source_element_id = ?, target_element_id = ?, name = ?, attributes_json = ?,
+                    valid_from = ?, valid_to = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE model_id = ? AND id = ?
+                """,
+                (
+                    type_name,
+                    source_element_id,
+                    target_element_id,
+                    name,
+                    attributes_json,
+                    valid_from,
+                    valid_to,
+                    model_id,
+                    relationship_id,
+                ),
+            )
 
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
+        row = _fetch_row(connection, "model_relationships", model_id, relationship_id)
+        version = _create_version(
+            connection, model_id, author, message, [("upsert_relationship", relationship_id, row)], model=model
+        )
         return {
-            "status": "updated" if exists else "created",
+            "status": "created" if created else "updated",
             "model_id": model_id,
             "relationship_id": relationship_id,
             "version": version,
         }
 
 
+def bulk_upsert_relationships(
+    model_id: str,
+    relationships: list[dict[str, Any]],
+    expected_version: int | None = None,
+    author: str = "system",
+    message: str = "Relationships bulk upserted",
+) -> dict[str, Any]:
+    """Upsert many relationships with one ``executemany`` and record a single version for all of them."""
+    rows = []
+    for position, relationship in enumerate(relationships):
+        for key in ("type_name", "source_element_id", "target_element_id"):
+            if not relationship.get(key):
+                raise ModelError(f"Relationship at index {position} is missing '{key}'")
+        rows.append(
+            (
+                model_id,
+                str(relationship.get("id") or _new_id(16)),
+                str(relationship["type_name"]),
+                str(relationship["source_element_id"]),
+                str(relationship["target_element_id"]),
+                str(relationship.get("name") or ""),
+                _dumps(relationship.get("attributes") or {}),
+                relationship.get("valid_from"),
+                relationship.get("valid_to"),
+            )
+        )
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
+        cursor = connection.cursor()
+        _ensure_elements_exist(cursor, model_id, {row[3] for row in rows} | {row[4] for row in rows})
+        cursor.executemany(_UPSERT_RELATIONSHIP_SQL, rows)
+        _refresh_statistics(connection)
+        version = _create_version(connection, model_id, author, message, model=model)
+        return {
+            "status": "upserted",
+            "model_id": model_id,
+            "count": len(rows),
+            "relationship_ids": [row[1] for row in rows],
+            "version": version,
+        }
+
+
 def delete_model_relationship(
     model_id: str,
     relationship_id: str,
@@ -495,16 +1066,17 @@ def delete_model_relationship(
     author: str = "system",
     message: str = "Relationship deleted",
 ) -> dict[str, Any]:
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
         cursor = connection.cursor()
         cursor.execute("DELETE FROM model_relationships WHERE model_id = ? AND id = ?", (model_id, relationship_id))
         deleted = int(cursor.rowcount)
         if deleted == 0:
             raise ModelError(f"Relationship '{relationship_id}' not found in model '{model_id}'")
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
+        version = _create_version(
+            connection, model_id, author, message, [("delete_relationship", relationship_id, None)], model=model
+        )
         return {
             "status": "deleted",
             "model_id": model_id,
@@ -522,32 +1094,32 @@ def list_model_relationships(
     limit: int = 200,
 ) -> list[dict[str, Any]]:
     limit = max(1, min(int(limit), 1000))
-    with get_connection() as connection:
+    with _conn() as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
-        sql = "SELECT * FROM model_relationships WHERE model_id = ?"
         params: list[Any] = [model_id]
         if type_name:
-            sql += " AND lower(type_name)=lower(?)"
             params.append(type_name)
         if source_element_id:
-            sql += " AND source_element_id = ?"
             params.append(source_element_id)
         if target_element_id:
-            sql += " AND target_element_id = ?"
             params.append(target_element_id)
         if valid_at:
-            sql += " AND (valid_from IS NULL OR valid_from <= ?) AND (valid_to IS NULL OR valid_to >= ?)"
             params.extend([valid_at, valid_at])
-        sql += " ORDER BY id LIMIT ?"
         params.append(limit)
-        cursor.execute(sql, params)
+        mask = (
+            (1 if type_name else 0)
+            | (2 if source_element_id else 0)
+            | (4 if target_element_id else 0)
+            | (8 if valid_at else 0)
+        )
+        cursor.execute(_LIST_RELATIONSHIPS_SQL[mask], params)
         return _row_dicts(cursor)
 
 
 def list_versions(model_id: str, limit: int = 100) -> list[dict[str, Any]]:
     limit = max(1, min(int(limit), 1000))
-    with get_connection() as connection:
+    with _conn() as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
         cursor.execute(
@@ -565,12 +1137,12 @@ def list_versions(model_id: str, limit: int = 100) -> list[dict[str, Any]]:
 
 
 def get_version(model_id: str, version: int) -> dict[str, Any]:
-    with get_connection() as connection:
+    with _conn() as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
         cursor.execute(
             """
-            SELECT id, model_id, version, author, message, created_at, snapshot_json
+            SELECT id, model_id, version, author, message, created_at
             FROM model_versions
             WHERE model_id = ? AND version = ?
             """,
@@ -586,7 +1158,7 @@ def get_version(model_id: str, version: int) -> dict[str, Any]:
             "author": row[3],
             "message": row[4],
             "created_at": row[5],
-            "snapshot": json.loads(row[6]),
+            "snapshot": _load_snapshot(connection, model_id, int(version)),
         }
 
 
@@ -596,9 +1168,8 @@ def revert_to_version(
     expected_version: int | None = None,
     author: str = "system",
 ) -> dict[str, Any]:
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    with _conn(write=True) as connection:
+        _ensure_expected_version(_ensure_model_exists(connection, model_id), expected_version)
         version_data = get_version(model_id, version)
         snapshot = version_data["snapshot"]
 
@@ -616,34 +1187,37 @@ def revert_to_version(
             (
                 model.get("name", ""),
                 model.get("description", ""),
-                json.dumps(model.get("attributes", {}), ensure_ascii=False),
+                _dumps(model.get("attributes", {})),
                 model_id,
             ),
         )
 
-        for element in snapshot.get("elements", []):
-            cursor.execute(
-                """
-                INSERT INTO model_elements(model_id, id, type_name, name, attributes_json, valid_from, valid_to)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
+        cursor.executemany(
+            """
+            INSERT INTO model_elements(model_id, id, type_name, name, attributes_json, valid_from, valid_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
                 (
                     model_id,
                     element["id"],
                     element["type_name"],
                     element.get("name", ""),
-                    json.dumps(element.get("attributes", {}), ensure_ascii=False),
+                    _dumps(element.get("attributes", {})),
                     element.get("valid_from"),
                     element.get("valid_to"),
-                ),
-            )
+                )
+                for element in snapshot.get("elements", [])
+            ],
+        )
+        element_ids = {element["id"] for element in snapshot.get("elements", [])}
 
-        for relationship in snapshot.get("relationships", []):
-            cursor.execute(
-                """
-                INSERT INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, valid_from, valid_to)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        cursor.executemany(
+            """
+            INSERT INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, valid_from, valid_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
                 (
                     model_id,
                     relationship["id"],
@@ -651,146 +1225,230 @@ def revert_to_version(
                     relationship["source_element_id"],
                     relationship["target_element_id"],
                     relationship.get("name", ""),
-                    json.dumps(relationship.get("attributes", {}), ensure_ascii=False),
+                    _dumps(relationship.get("attributes", {})),
                     relationship.get("valid_from"),
                     relationship.get("valid_to"),
-                ),
-            )
+                )
+                for relationship in snapshot.get("relationships", [])
+                # versions recorded before endpoints were foreign keys may hold dangling relationships
+                if relationship["source_element_id"] in element_ids and relationship["target_element_id"] in element_ids
+            ],
+        )
 
         new_version = _create_version(connection, model_id, author, f"Reverted to version {version}")
-        connection.commit()
         return {"status": "reverted", "model_id": model_id, "from_version": int(version), "version": new_version}
 
 
+# below this many relationships the JIT dispatch and array setup cost more than the plain loop
+_JIT_MIN_RELATIONSHIPS = 5000
+
+# bit, severity, code, message template for the flags returned by _scan_relationships
+_RELATIONSHIP_FLAG_ISSUES = (
+    (
+        1,
+        "error",
+        "MISSING_REL_ENDPOINT",
+        "Relationship '{rel_id}' references missing endpoint(s): source={src}, target={tgt}",
+    ),
+    (2, "error", "INVALID_REL_TIME_RANGE", "Relationship '{rel_id}' has valid_from later than valid_to"),
+    (4, "warning", "REL_BEFORE_SOURCE", "Relationship '{rel_id}' starts before source element validity"),
+    (8, "warning", "REL_BEFORE_TARGET", "Relationship '{rel_id}' starts before target element validity"),
+    (16, "warning", "REL_AFTER_SOURCE", "Relationship '{rel_id}' ends after source element validity"),
+    (32, "warning", "REL_AFTER_TARGET", "Relationship '{rel_id}' ends after target element validity"),
+)
+
+if numba is not None:
+
+    @numba.njit
+    def _scan_relationships(src_idx, tgt_idx, rel_from, rel_to, el_from, el_to):
+        """Return one ``_RELATIONSHIP_FLAG_ISSUES`` bitmask per relationship; -1 marks a missing id or date."""
+        flags = np.zeros(len(src_idx), dtype=np.int64)
+        for i in range(len(src_idx)):
+            src = src_idx[i]
+            tgt = tgt_idx[i]
+            valid_from = rel_from[i]
+            valid_to = rel_to[i]
+            flag = 0
+            if src < 0 or tgt < 0:
+                flag |= 1
+            if valid_from >= 0 and valid_to >= 0 and valid_from > valid_to:
+                flag |= 2
+            if valid_from >= 0 and src >= 0 and tgt >= 0:
+                if el_from[src] >= 0 and valid_from < el_from[src]:
+                    flag |= 4
+                if el_from[tgt] >= 0 and valid_from < el_from[tgt]:
+                    flag |= 8
+                if valid_to >= 0 and el_to[src] >= 0 and valid_to > el_to[src]:
+                    flag |= 16
+                if valid_to >= 0 and el_to[tgt] >= 0 and valid_to > el_to[tgt]:
+                    flag |= 32
+            flags[i] = flag
+        return flags
+
+else:
+    _scan_relationships = None
+
+
+def _iter_relationship_issues_jit(
+    relationships: list[Any],
+    element_spans: dict[str, tuple[str | None, str | None]],
+    known_relationship_types: frozenset[str],
+) -> Iterator[dict[str, Any]]:
+    # dates are compared as strings, so ranking the distinct values keeps every comparison exact
+    dates = {date for span in element_spans.values() for date in span if date}
+    dates.update(date for row in relationships for date in (row[4], row[5]) if date)
+    rank = {date: position for position, date in enumerate(sorted(dates))}
+    index = {element_id: position for position, element_id in enumerate(element_spans)}
+    flags = _scan_relationships(
+        np.array([index.get(row[2], -1) for row in relationships], dtype=np.int64),
+        np.array([index.get(row[3], -1) for row in relationships], dtype=np.int64),
+        np.array([rank.get(row[4], -1) for row in relationships], dtype=np.int64),
+        np.array([rank.get(row[5], -1) for row in relationships], dtype=np.int64),
+        np.array([rank.get(span[0], -1) for span in element_spans.values()], dtype=np.int64),
+        np.array([rank.get(span[1], -1) for span in element_spans.values()], dtype=np.int64),
+    )
+    for (rel_id, type_name, src, tgt, _valid_from, _valid_to), flag in zip(relationships, flags):
+        if type_name.lower() not in known_relationship_types:
+            yield {
+                "severity": "error",
+                "code": "UNKNOWN_RELATIONSHIP_TYPE",
+                "message": f"Relationship '{rel_id}' uses unknown type '{type_name}'",
+                "relationship_id": rel_id,
+            }
+        if not flag:
+            continue
+        for bit, severity, code, template in _RELATIONSHIP_FLAG_ISSUES:
+            if flag & bit:
+                yield {
+                    "severity": severity,
+                    "code": code,
+                    "message": template.format(rel_id=rel_id, src=src, tgt=tgt),
+                    "relationship_id": rel_id,
+                }
+
+
+def _iter_issues(
+    elements: list[Any],
+    relationships: list[Any],
+    known_element_types: frozenset[str],
+    known_relationship_types: frozenset[str],
+) -> Iterator[dict[str, Any]]:
+    # element id -> (valid_from, valid_to), filled in the same pass that checks the elements
+    element_spans: dict[str, tuple[str | None, str | None]] = {}
+    for element_id, type_name, valid_from, valid_to in elements:
+        element_spans[element_id] = (valid_from, valid_to)
+        if type_name.lower() not in known_element_types:
+            yield {
+                "severity": "error",
+                "code": "UNKNOWN_ELEMENT_TYPE",
+                "message": f"Element '{element_id}' uses unknown type '{type_name}'",
+                "element_id": element_id,
+            }
+        if valid_from and valid_to and valid_from > valid_to:
+            yield {
+                "severity": "error",
+                "code": "INVALID_ELEMENT_TIME_RANGE",
+                "message": f"Element '{element_id}' has valid_from later than valid_to",
+                "element_id": element_id,
+            }
+
+    if _scan_relationships is not None and len(relationships) >= _JIT_MIN_RELATIONSHIPS:
+        yield from _iter_relationship_issues_jit(relationships, element_spans, known_relationship_types)
+        return
+
+    for rel_id, type_name, src, tgt, valid_from, valid_to in relationships:
+        src_span = element_spans.get(src)
+        tgt_span = element_spans.get(tgt)
+        if type_name.lower() not in known_relationship_types:
+            yield {
+                "severity": "error",
+                "code": "UNKNOWN_RELATIONSHIP_TYPE",
+                "message": f"Relationship '{rel_id}' uses unknown type '{type_name}'",
+                "relationship_id": rel_id,
+            }
+        if src_span is None or tgt_span is None:
+            yield {
+                "severity": "error",
+                "code": "MISSING_REL_ENDPOINT",
+                "message": f"Relationship '{rel_id}' references missing endpoint(s): source={src}, target={tgt}",
+                "relationship_id": rel_id,
+            }
+        if valid_from and valid_to and valid_from > valid_to:
+            yield {
+                "severity": "error",
+                "code": "INVALID_REL_TIME_RANGE",
+                "message": f"Relationship '{rel_id}' has valid_from later than valid_to",
+                "relationship_id": rel_id,
+            }
+        if valid_from and src_span is not None and tgt_span is not None:
+            src_from, src_to = src_span
+            tgt_from, tgt_to = tgt_span
+            if src_from and valid_from < src_from:
+                yield {
+                    "severity": "warning",
+                    "code": "REL_BEFORE_SOURCE",
+                    "message": f"Relationship '{rel_id}' starts before source element validity",
+                    "relationship_id": rel_id,
+                }
+            if tgt_from and valid_from < tgt_from:
+                yield {
+                    "severity": "warning",
+                    "code": "REL_BEFORE_TARGET",
+                    "message": f"Relationship '{rel_id}' starts before target element validity",
+                    "relationship_id": rel_id,
+                }
+            if valid_to and src_to and valid_to > src_to:
+                yield {
+                    "severity": "warning",
+                    "code": "REL_AFTER_SOURCE",
+                    "message": f"Relationship '{rel_id}' ends after source element validity",
+                    "relationship_id": rel_id,
+                }
+            if valid_to and tgt_to and valid_to > tgt_to:
+                yield {
+                    "severity": "warning",
+                    "code": "REL_AFTER_TARGET",
+                    "message": f"Relationship '{rel_id}' ends after target element validity",
+                    "relationship_id": rel_id,
+                }
+
+
 def validate_model(model_id: str) -> dict[str, Any]:
-    with get_connection() as connection:
+    with _conn() as connection:
         model = _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
 
         cursor.execute("SELECT id, type_name, valid_from, valid_to FROM model_elements WHERE model_id = ?", (model_id,))
         elements = cursor.fetchall()
-        element_ids = {row[0] for row in elements}
-
-        cursor.execute("SELECT name FROM elements")
-        known_element_types = {row[0].lower() for row in cursor.fetchall()}
 
         cursor.execute("SELECT id, type_name, source_element_id, target_element_id, valid_from, valid_to FROM model_relationships WHERE model_id = ?", (model_id,))
         relationships = cursor.fetchall()
 
-        cursor.execute("SELECT name FROM relationships")
-        known_relationship_types = {row[0].lower() for row in cursor.fetchall()}
-
-        issues: list[dict[str, Any]] = []
-
-        for element_id, type_name, valid_from, valid_to in elements:
-            if type_name.lower() not in known_element_types:
-                issues.append(
-                    {
-                        "severity": "error",
-                        "code": "UNKNOWN_ELEMENT_TYPE",
-                        "message": f"Element '{element_id}' uses unknown type '{type_name}'",
-                        "element_id": element_id,
-                    }
-                )
-            if valid_from and valid_to and valid_from > valid_to:
-                issues.append(
-                    {
-                        "severity": "error",
-                        "code": "INVALID_ELEMENT_TIME_RANGE",
-                        "message": f"Element '{element_id}' has valid_from later than valid_to",
-                        "element_id": element_id,
-                    }
-                )
-
-        elem_time = {row[0]: (row[2], row[3]) for row in elements}
-
-        for rel_id, type_name, src, tgt, valid_from, valid_to in relationships:
-            if type_name.lower() not in known_relationship_types:
-                issues.append(
-                    {
-                        "severity": "error",
-                        "code": "UNKNOWN_RELATIONSHIP_TYPE",
-                        "message": f"Relationship '{rel_id}' uses unknown type '{type_name}'",
-                        "relationship_id": rel_id,
-                    }
-                )
-            if src not in element_ids or tgt not in element_ids:
-                issues.append(
-                    {
-                        "severity": "error",
-                        "code": "MISSING_REL_ENDPOINT",
-                        "message": f"Relationship '{rel_id}' references missing endpoint(s): source={src}, target={tgt}",
-                        "relationship_id": rel_id,
-                    }
-                )
-            if valid_from and valid_to and valid_from > valid_to:
-                issues.append(
-                    {
-                        "severity": "error",
-                        "code": "INVALID_REL_TIME_RANGE",
-                        "message": f"Relationship '{rel_id}' has valid_from later than valid_to",
-                        "relationship_id": rel_id,
-                    }
-                )
-            if src in elem_time and tgt in elem_time and valid_from:
-                src_from, src_to = elem_time[src]
-                tgt_from, tgt_to = elem_time[tgt]
-                if src_from and valid_from < src_from:
-                    issues.append(
-                        {
-                            "severity": "warning",
-                            "code": "REL_BEFORE_SOURCE",
-                            "message": f"Relationship '{rel_id}' starts before source element validity",
-                            "relationship_id": rel_id,
-                        }
-                    )
-                if tgt_from and valid_from < tgt_from:
-                    issues.append(
-                        {
-                            "severity": "warning",
-                            "code": "REL_BEFORE_TARGET",
-                            "message": f"Relationship '{rel_id}' starts before target element validity",
-                            "relationship_id": rel_id,
-                        }
-                    )
-                if valid_to and src_to and valid_to > src_to:
-                    issues.append(
-                        {
-                            "severity": "warning",
-                            "code": "REL_AFTER_SOURCE",
-                            "message": f"Relationship '{rel_id}' ends after source element validity",
-                            "relationship_id": rel_id,
-                        }
-                    )
-                if valid_to and tgt_to and valid_to > tgt_to:
-                    issues.append(
-                        {
-                            "severity": "warning",
-                            "code": "REL_AFTER_TARGET",
-                            "message": f"Relationship '{rel_id}' ends after target element validity",
-                            "relationship_id": rel_id,
-                        }
-                    )
-
-        error_count = sum(1 for issue in issues if issue["severity"] == "error")
-        warning_count = len(issues) - error_count
+    issues = list(
+        _iter_issues(
+            elements, relationships, known_type_names("elements"), known_type_names("relationships")
+        )
+    )
+    error_count = sum(1 for issue in issues if issue["severity"] == "error")
+    warning_count = len(issues) - error_count
 
-        return {
-            "model_id": model["id"],
-            "model_name": model["name"],
-            "is_valid": error_count == 0,
-            "summary": {
-                "elements": len(elements),
-                "relationships": len(relationships),
-                "errors": error_count,
-                "warnings": warning_count,
-            },
-            "issues": issues,
-        }
+    return {
+        "model_id": model["id"],
+        "model_name": model["name"],
+        "is_valid": error_count == 0,
+        "summary": {
+            "elements": len(elements),
+            "relationships": len(relationships),
+            "errors": error_count,
+            "warnings": warning_count,
+        },
+        "issues": issues,
+    }
 
 
-def generate_report(model_id: str) -> dict[str, Any]:
-    with get_connection() as connection:
+def _report_with_validation(model_id: str) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Build the report and hand back the full validation it summarises, so callers need not re-validate."""
+    with _conn() as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
 
@@ -818,60 +1476,41 @@ def generate_report(model_id: str) -> dict[str, Any]:
         )
         relationship_type_counts = [{"type": row[0], "count": row[1]} for row in cursor.fetchall()]
 
+        # layers live in the metamodel database, so they are folded in from the per-type counts;
+        # most_common() would order count ties by first appearance, so the sort keeps the layer-name tie-break
+        layers = element_layers()
+        per_layer: Counter[str] = Counter()
+        for item in element_type_counts:
+            per_layer[layers.get(item["type"].lower(), "Unknown")] += item["count"]
+        layer_counts = [
+            {"layer": layer, "count": count}
+            for layer, count in sorted(per_layer.items(), key=lambda entry: (-entry[1], entry[0]))
+        ]
+
+        element_total = sum(item["count"] for item in element_type_counts)
+        relationship_total = sum(item["count"] for item in relationship_type_counts)
+
+        # each element's degree is two range counts on the covering endpoint indexes, so no edge list is
+        # materialised or grouped; ORDER BY ... LIMIT keeps only the current top 10 while scanning
         cursor.execute(
             """
-            SELECT COALESCE(e.layer, 'Unknown') AS layer, COUNT(*)
+            SELECT me.id, me.name,
+                (SELECT COUNT(*) FROM model_relationships mr
+                 WHERE mr.model_id = me.model_id AND mr.source_element_id = me.id)
+                + (SELECT COUNT(*) FROM model_relationships mr
+                   WHERE mr.model_id = me.model_id AND mr.target_element_id = me.id) AS degree
             FROM model_elements me
-            LEFT JOIN elements e ON lower(e.name) = lower(me.type_name)
             WHERE me.model_id = ?
-            GROUP BY COALESCE(e.layer, 'Unknown')
-            ORDER BY COUNT(*) DESC, layer
-            """,
-            (model_id,),
-        )
-        layer_counts = [{"layer": row[0], "count": row[1]} for row in cursor.fetchall()]
-
-        cursor.execute("SELECT COUNT(*) FROM model_elements WHERE model_id = ?", (model_id,))
-        element_total = int(cursor.fetchone()[0])
-        cursor.execute("SELECT COUNT(*) FROM model_relationships WHERE model_id = ?", (model_id,))
-        relationship_total = int(cursor.fetchone()[0])
-
-        cursor.execute(
-            """
-            SELECT id, name
-            FROM model_elements
-            WHERE model_id = ?
-            """,
-            (model_id,),
-        )
-        elements = cursor.fetchall()
-        degree = {row[0]: 0 for row in elements}
-
-        cursor.execute(
-            """
-            SELECT source_element_id, target_element_id
-            FROM model_relationships
-            WHERE model_id = ?
+            ORDER BY degree DESC, me.id
+            LIMIT 10
             """,
             (model_id,),
         )
-        for source_element_id, target_element_id in cursor.fetchall():
-            if source_element_id in degree:
-                degree[source_element_id] += 1
-            if target_element_id in degree:
-                degree[target_element_id] += 1
-
-        top_connected = sorted(
-            (
-                {"element_id": row[0], "name": row[1], "degree": degree.get(row[0], 0)}
-                for row in elements
-            ),
-            key=lambda item: (-item["degree"], item["element_id"]),
-        )[:10]
+        top_connected = [{"element_id": row[0], "name": row[1], "degree": row[2]} for row in cursor.fetchall()]
 
     validation = validate_model(model_id)
 
-    return {
+    report = {
         "model_id": model_id,
         "totals": {
             "elements": element_total,
@@ -884,11 +1523,15 @@ def generate_report(model_id: str) -> dict[str, Any]:
         "top_connected_elements": top_connected,
         "validation_summary": validation["summary"],
     }
+    return report, validation
+
+
+def generate_report(model_id: str) -> dict[str, Any]:
+    return _report_with_validation(model_id)[0]
 
 
 def generate_insights(model_id: str) -> dict[str, Any]:
-    report = generate_report(model_id)
-    validation = validate_model(model_id)
+    report, validation = _report_with_validation(model_id)
 
     suggestions: list[dict[str, str]] = []
     totals = report["totals"]
@@ -943,8 +1586,30 @@ def generate_insights(model_id: str) -> dict[str, Any]:
     }
 
 
+# CSV column order, fixed once; the SELECTs yield tuples in exactly this order for csv.writer, and
+# stored attribute JSON is copied through rather than re-encoded
+_CSV_ELEMENT_FIELDS = ("id", "type_name", "name", "valid_from", "valid_to", "attributes_json")
+_CSV_RELATIONSHIP_FIELDS = (
+    "id",
+    "type_name",
+    "source_element_id",
+    "target_element_id",
+    "name",
+    "valid_from",
+    "valid_to",
+    "attributes_json",
+)
+_CSV_ELEMENT_SQL = (
+    f"SELECT {', '.join(_CSV_ELEMENT_FIELDS[:-1])}, {_JSON_COLUMN.format('attributes_json')} "
+    "FROM model_elements WHERE model_id = ? ORDER BY id"
+)
+_CSV_RELATIONSHIP_SQL = (
+    f"SELECT {', '.join(_CSV_RELATIONSHIP_FIELDS[:-1])}, {_JSON_COLUMN.format('attributes_json')} "
+    "FROM model_relationships WHERE model_id = ? ORDER BY id"
+)
+
+
 def export_model_csv(model_id: str, filename_prefix: str | None = None) -> dict[str, Any]:
-    model = get_model(model_id, include_graph=True)
     prefix = filename_prefix or f"archimate_{model_id}"
     safe_prefix = "".join(ch for ch in prefix if ch.isalnum() or ch in ("-", "_", ".")) or f"archimate_{model_id}"
 
@@ -952,43 +1617,19 @@ def export_model_csv(model_id: str, filename_prefix: str | None = None) -> dict[
     elem_path = EXPORTS_DIR / f"{safe_prefix}_elements.csv"
     rel_path = EXPORTS_DIR / f"{safe_prefix}_relationships.csv"
 
-    with elem_path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["id", "type_name", "name", "valid_from", "valid_to", "attributes_json"],
-        )
-        writer.writeheader()
-        for element in model["elements"]:
-            writer.writerow(
-                {
-                    "id": element["id"],
-                    "type_name": element["type_name"],
-                    "name": element.get("name", ""),
-                    "valid_from": element.get("valid_from") or "",
-                    "valid_to": element.get("valid_to") or "",
-                    "attributes_json": json.dumps(element.get("attributes", {}), ensure_ascii=False),
-                }
-            )
+    with _conn() as connection:
+        _ensure_model_exists(connection, model_id)
+        cursor = connection.cursor()
 
-    with rel_path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["id", "type_name", "source_element_id", "target_element_id", "name", "valid_from", "valid_to", "attributes_json"],
-        )
-        writer.writeheader()
-        for relationship in model["relationships"]:
-            writer.writerow(
-                {
-                    "id": relationship["id"],
-                    "type_name": relationship["type_name"],
-                    "source_element_id": relationship["source_element_id"],
-                    "target_element_id": relationship["target_element_id"],
-                    "name": relationship.get("name", ""),
-                    "valid_from": relationship.get("valid_from") or "",
-                    "valid_to": relationship.get("valid_to") or "",
-                    "attributes_json": json.dumps(relationship.get("attributes", {}), ensure_ascii=False),
-                }
-            )
+        with elem_path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(_CSV_ELEMENT_FIELDS)
+            writer.writerows(cursor.execute(_CSV_ELEMENT_SQL, (model_id,)))
+
+        with rel_path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(_CSV_RELATIONSHIP_FIELDS)
+            writer.writerows(cursor.execute(_CSV_RELATIONSHIP_SQL, (model_id,)))
 
     return {
         "model_id": model_id,
@@ -1005,109 +1646,185 @@ def import_model_csv(
     expected_version: int | None = None,
     author: str = "system",
 ) -> dict[str, Any]:
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
         cursor = connection.cursor()
 
         if replace:
             cursor.execute("DELETE FROM model_relationships WHERE model_id = ?", (model_id,))
             cursor.execute("DELETE FROM model_elements WHERE model_id = ?", (model_id,))
 
-        element_rows = list(csv.DictReader(io.StringIO(elements_csv)))
-        relationship_rows = list(csv.DictReader(io.StringIO(relationships_csv)))
-
-        for row in element_rows:
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO model_elements(model_id, id, type_name, name, attributes_json, valid_from, valid_to, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """,
-                (
-                    model_id,
-                    row["id"],
-                    row["type_name"],
-                    row.get("name", ""),
-                    row.get("attributes_json") or "{}",
-                    row.get("valid_from") or None,
-                    row.get("valid_to") or None,
-                ),
+        # both files are parsed lazily and written _IMPORT_BATCH_SIZE rows at a time, so memory stays
+        # bounded by the batch rather than the file; all elements land before any relationship is checked
+        element_params = (
+            (
+                model_id,
+                row["id"],
+                row["type_name"],
+                row.get("name", ""),
+                row.get("attributes_json") or "{}",
+                row.get("valid_from") or None,
+                row.get("valid_to") or None,
             )
-
-        for row in relationship_rows:
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, valid_from, valid_to, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """,
-                (
-                    model_id,
-                    row["id"],
-                    row["type_name"],
-                    row["source_element_id"],
-                    row["target_element_id"],
-                    row.get("name", ""),
-                    row.get("attributes_json") or "{}",
-                    row.get("valid_from") or None,
-                    row.get("valid_to") or None,
-                ),
+            for row in csv.DictReader(io.StringIO(elements_csv))
+        )
+        relationship_params = (
+            (
+                model_id,
+                row["id"],
+                row["type_name"],
+                row["source_element_id"],
+                row["target_element_id"],
+                row.get("name", ""),
+                row.get("attributes_json") or "{}",
+                row.get("valid_from") or None,
+                row.get("valid_to") or None,
             )
+            for row in csv.DictReader(io.StringIO(relationships_csv))
+        )
 
-        version = _create_version(connection, model_id, author, "Model imported from CSV")
-        connection.commit()
+        element_count = 0
+        while batch := list(islice(element_params, _IMPORT_BATCH_SIZE)):
+            cursor.executemany(_UPSERT_ELEMENT_SQL, batch)
+            element_count += len(batch)
+        relationship_count = 0
+        while batch := list(islice(relationship_params, _IMPORT_BATCH_SIZE)):
+            _ensure_elements_exist(cursor, model_id, {row[3] for row in batch} | {row[4] for row in batch})
+            cursor.executemany(_UPSERT_RELATIONSHIP_SQL, batch)
+            relationship_count += len(batch)
+
+        _refresh_statistics(connection)
+        version = _create_version(connection, model_id, author, "Model imported from CSV", model=model)
         return {
             "status": "imported",
             "model_id": model_id,
-            "elements": len(element_rows),
-            "relationships": len(relationship_rows),
+            "elements": element_count,
+            "relationships": relationship_count,
             "version": version,
         }
 
 
+# same entity set ElementTree uses for attribute values, so exported documents are unchanged
+_XML_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+def _xml_open(tag: str, attrs: dict[str, Any]) -> str:
+    rendered = "".join(
+        f' {key}="{escape(str(value), _XML_ATTR_ENTITIES)}"' for key, value in attrs.items() if value is not None
+    )
+    return f"<{tag}{rendered}"
+
+
+def _xml_text_element(tag: str, text: str | None) -> str:
+    return f"<{tag}>{escape(text)}</{tag}>" if text else f"<{tag} />"
+
+
 def export_model_xml(model_id: str) -> str:
-    model = get_model(model_id, include_graph=True)
-
-    root = ET.Element("archimateModel", attrib={"id": model_id, "name": model["name"]})
-    ET.SubElement(root, "description").text = model.get("description", "")
-    ET.SubElement(root, "attributes").text = json.dumps(model.get("attributes", {}), ensure_ascii=False)
-
-    elements_node = ET.SubElement(root, "elements")
-    for element in model["elements"]:
-        node = ET.SubElement(
-            elements_node,
-            "element",
-            attrib={
-                "id": element["id"],
-                "type": element["type_name"],
-                "name": element.get("name", ""),
-            },
-        )
-        if element.get("valid_from"):
-            node.set("valid_from", str(element["valid_from"]))
-        if element.get("valid_to"):
-            node.set("valid_to", str(element["valid_to"]))
-        ET.SubElement(node, "attributes").text = json.dumps(element.get("attributes", {}), ensure_ascii=False)
-
-    relationships_node = ET.SubElement(root, "relationships")
-    for relationship in model["relationships"]:
-        node = ET.SubElement(
-            relationships_node,
-            "relationship",
-            attrib={
-                "id": relationship["id"],
-                "type": relationship["type_name"],
-                "source": relationship["source_element_id"],
-                "target": relationship["target_element_id"],
-                "name": relationship.get("name", ""),
-            },
+    # rows are serialised straight from the cursor into one buffer; no element tree is built, and
+    # stored attribute JSON becomes the <attributes> text without a decode/encode round-trip
+    out = io.StringIO()
+    write = out.write
+    with _conn() as connection:
+        model = _ensure_model_exists(connection, model_id)
+        write(_xml_open("archimateModel", {"id": model_id, "name": model["name"]}) + ">")
+        write(_xml_text_element("description", model.get("description", "")))
+        write(_xml_text_element("attributes", _dumps(model.get("attributes", {}))))
+
+        cursor = connection.cursor()
+        cursor.execute(
+            f"""
+            SELECT id, type_name, name, valid_from, valid_to, {_JSON_COLUMN.format('attributes_json')}
+            FROM model_elements WHERE model_id = ? ORDER BY id
+            """,
+            (model_id,),
         )
-        if relationship.get("valid_from"):
-            node.set("valid_from", str(relationship["valid_from"]))
-        if relationship.get("valid_to"):
-            node.set("valid_to", str(relationship["valid_to"]))
-        ET.SubElement(node, "attributes").text = json.dumps(relationship.get("attributes", {}), ensure_ascii=False)
+        empty = True
+        for element_id, type_name, name, valid_from, valid_to, attributes_json in cursor:
+            attrs = {"id": element_id, "type": type_name, "name": name or ""}
+            if valid_from:
+                attrs["valid_from"] = valid_from
+            if valid_to:
+                attrs["valid_to"] = valid_to
+            if empty:
+                write("<elements>")
+                empty = False
+            write(_xml_open("element", attrs) + ">")
+            write(_xml_text_element("attributes", attributes_json))
+            write("</element>")
+        write("<elements />" if empty else "</elements>")
 
-    return ET.tostring(root, encoding="unicode")
+        cursor.execute(
+            f"""
+            SELECT id, type_name, source_element_id, target_element_id, name, valid_from, valid_to,
+                {_JSON_COLUMN.format('attributes_json')}
+            FROM model_relationships WHERE model_id = ? ORDER BY id
+            """,
+            (model_id,),
+        )
+        empty = True
+        for relationship_id, type_name, source_id, target_id, name, valid_from, valid_to, attributes_json in cursor:
+            attrs = {
+                "id": relationship_id,
+                "type": type_name,
+                "source": source_id,
+                "target": target_id,
+                "name": name or "",
+            }
+            if valid_from:
+                attrs["valid_from"] = valid_from
+            if valid_to:
+                attrs["valid_to"] = valid_to
+            if empty:
+                write("<relationships>")
+                empty = False
+            write(_xml_open("relationship", attrs) + ">")
+            write(_xml_text_element("attributes", attributes_json))
+            write("</relationship>")
+        write("<relationships />" if empty else "</relationships>")
+
+    write("</archimateModel>")
+    return out.getvalue()
+
+
+def _iter_xml_rows(model_id: str, xml_content: str) -> Iterator[tuple[str, tuple[Any, ...]]]:
+    """Yield ``("element" | "relationship", params)`` while parsing; handled nodes are detached to bound memory."""
+    # the stdlib parser is expat plus the C ElementTree accelerator; lxml's iterparse was measured slower
+    # for these small, attribute-heavy nodes, so it is not used here
+    path: list[ET.Element] = []
+    for event, node in ET.iterparse(io.StringIO(xml_content), events=("start", "end")):
+        if event == "start":
+            if not path and node.tag != "archimateModel":
+                raise ModelError("Invalid XML root. Expected 'archimateModel'")
+            path.append(node)
+            continue
+        path.pop()
+        if len(path) != 2:
+            continue
+        section = path[1]
+        if section.tag == "elements" and node.tag == "element":
+            yield "element", (
+                model_id,
+                node.attrib["id"],
+                node.attrib.get("type", ""),
+                node.attrib.get("name", ""),
+                (node.findtext("attributes") or "{}"),
+                node.attrib.get("valid_from"),
+                node.attrib.get("valid_to"),
+            )
+        elif section.tag == "relationships" and node.tag == "relationship":
+            yield "relationship", (
+                model_id,
+                node.attrib["id"],
+                node.attrib.get("type", ""),
+                node.attrib.get("source", ""),
+                node.attrib.get("target", ""),
+                node.attrib.get("name", ""),
+                (node.findtext("attributes") or "{}"),
+                node.attrib.get("valid_from"),
+                node.attrib.get("valid_to"),
+            )
+        section.remove(node)
 
 
 def import_model_xml(
@@ -1117,77 +1834,49 @@ def import_model_xml(
     expected_version: int | None = None,
     author: str = "system",
 ) -> dict[str, Any]:
-    root = ET.fromstring(xml_content)
-    if root.tag != "archimateModel":
-        raise ModelError("Invalid XML root. Expected 'archimateModel'")
-
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        _ensure_expected_version(connection, model_id, expected_version)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        _ensure_expected_version(model, expected_version)
         cursor = connection.cursor()
 
         if replace:
             cursor.execute("DELETE FROM model_relationships WHERE model_id = ?", (model_id,))
             cursor.execute("DELETE FROM model_elements WHERE model_id = ?", (model_id,))
 
-        element_count = 0
-        relationship_count = 0
-
-        elements_node = root.find("elements")
-        if elements_node is not None:
-            for node in elements_node.findall("element"):
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO model_elements(model_id, id, type_name, name, attributes_json, valid_from, valid_to, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    """,
-                    (
-                        model_id,
-                        node.attrib["id"],
-                        node.attrib.get("type", ""),
-                        node.attrib.get("name", ""),
-                        (node.findtext("attributes") or "{}"),
-                        node.attrib.get("valid_from"),
-                        node.attrib.get("valid_to"),
-                    ),
-                )
-                element_count += 1
-
-        relationships_node = root.find("relationships")
-        if relationships_node is not None:
-            for node in relationships_node.findall("relationship"):
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO model_relationships(model_id, id, type_name, source_element_id, target_element_id, name, attributes_json, valid_from, valid_to, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    """,
-                    (
-                        model_id,
-                        node.attrib["id"],
-                        node.attrib.get("type", ""),
-                        node.attrib.get("source", ""),
-                        node.attrib.get("target", ""),
-                        node.attrib.get("name", ""),
-                        (node.findtext("attributes") or "{}"),
-                        node.attrib.get("valid_from"),
-                        node.attrib.get("valid_to"),
-                    ),
-                )
-                relationship_count += 1
-
-        version = _create_version(connection, model_id, author, "Model imported from XML")
-        connection.commit()
+        # rows are written in batches as they are parsed; relationships may precede their endpoints in the
+        # document, so endpoint foreign keys are checked at commit and reported up front below
+        connection.execute("PRAGMA defer_foreign_keys=ON")
+        batches: dict[str, list[tuple[Any, ...]]] = {"element": [], "relationship": []}
+        statements = {"element": _UPSERT_ELEMENT_SQL, "relationship": _UPSERT_RELATIONSHIP_SQL}
+        counts = {"element": 0, "relationship": 0}
+        endpoints: set[str] = set()
+        for kind, params in _iter_xml_rows(model_id, xml_content):
+            batch = batches[kind]
+            batch.append(params)
+            if kind == "relationship":
+                endpoints.update(params[3:5])
+            if len(batch) >= _IMPORT_BATCH_SIZE:
+                cursor.executemany(statements[kind], batch)
+                counts[kind] += len(batch)
+                batch.clear()
+        for kind, batch in batches.items():
+            cursor.executemany(statements[kind], batch)
+            counts[kind] += len(batch)
+        _ensure_elements_exist(cursor, model_id, endpoints)
+
+        _refresh_statistics(connection)
+        version = _create_version(connection, model_id, author, "Model imported from XML", model=model)
         return {
             "status": "imported",
             "model_id": model_id,
-            "elements": element_count,
-            "relationships": relationship_count,
+            "elements": counts["element"],
+            "relationships": counts["relationship"],
             "version": version,
         }
 
 
 def acquire_lock(model_id: str, owner: str, force: bool = False) -> dict[str, Any]:
-    with get_connection() as connection:
+    with _conn(write=True) as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
         cursor.execute("SELECT owner, acquired_at FROM model_locks WHERE model_id = ?", (model_id,))
@@ -1198,36 +1887,40 @@ def acquire_lock(model_id: str, owner: str, force: bool = False) -> dict[str, An
                 return {"status": "already_locked", "model_id": model_id, "owner": owner, "acquired_at": acquired_at}
             if not force:
                 raise ModelError(f"Model '{model_id}' is locked by '{current_owner}'")
-            cursor.execute("DELETE FROM model_locks WHERE model_id = ?", (model_id,))
 
+        # a forced takeover overwrites the previous holder's row in place
         cursor.execute(
             """
             INSERT INTO model_locks(model_id, owner)
             VALUES (?, ?)
+            ON CONFLICT(model_id) DO UPDATE SET owner = excluded.owner, acquired_at = CURRENT_TIMESTAMP
+            RETURNING owner, acquired_at
             """,
             (model_id, owner),
         )
-        connection.commit()
-        cursor.execute("SELECT owner, acquired_at FROM model_locks WHERE model_id = ?", (model_id,))
         owner_value, acquired_at = cursor.fetchone()
         return {"status": "locked", "model_id": model_id, "owner": owner_value, "acquired_at": acquired_at}
 
 
 def release_lock(model_id: str, owner: str | None = None, force: bool = False) -> dict[str, Any]:
-    with get_connection() as connection:
+    with _conn(write=True) as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
+        owner = owner or None
+        cursor.execute(
+            "DELETE FROM model_locks WHERE model_id = ? AND (? OR ? IS NULL OR owner = ?) RETURNING owner",
+            (model_id, force, owner, owner),
+        )
+        row = cursor.fetchone()
+        if row:
+            return {"status": "released", "model_id": model_id, "owner": row[0]}
+
+        # nothing deleted: either there is no lock or it belongs to someone else
         cursor.execute("SELECT owner FROM model_locks WHERE model_id = ?", (model_id,))
         row = cursor.fetchone()
         if not row:
             return {"status": "not_locked", "model_id": model_id}
-        current_owner = row[0]
-        if not force and owner and owner != current_owner:
-            raise ModelError(f"Lock owner mismatch. Model '{model_id}' is locked by '{current_owner}'")
-
-        cursor.execute("DELETE FROM model_locks WHERE model_id = ?", (model_id,))
-        connection.commit()
-        return {"status": "released", "model_id": model_id, "owner": current_owner}
+        raise ModelError(f"Lock owner mismatch. Model '{model_id}' is locked by '{row[0]}'")
 
 
 
@@ -1238,7 +1931,7 @@ def release_lock(model_id: str, owner: str | None = None, force: bool = False) -
 def list_attribute_definitions(model_id: str, target_type: str) -> list[dict]:
     """Return attribute keys, descriptions, and is_tag flags for a given model and target_type.
     target_type must be 'element' or 'relationship'."""
-    with get_connection() as connection:
+    with _conn() as connection:
         cursor = connection.cursor()
         cursor.execute(
             "SELECT key, description, is_tag FROM model_attribute_definitions "
@@ -1250,7 +1943,7 @@ def list_attribute_definitions(model_id: str, target_type: str) -> list[dict]:
 
 def list_tag_definitions(model_id: str, target_type: str) -> list[dict]:
     """Return only attribute definitions that are marked as tags (is_tag=1)."""
-    with get_connection() as connection:
+    with _conn() as connection:
         cursor = connection.cursor()
         cursor.execute(
             "SELECT key, description FROM model_attribute_definitions "
@@ -1269,7 +1962,7 @@ def define_attribute(model_id: str, target_type: str, key: str, description: str
     """
     if target_type not in ("element", "relationship"):
         raise ModelError("target_type must be 'element' or 'relationship'")
-    with get_connection() as connection:
+    with _conn(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute(
             """
@@ -1279,19 +1972,17 @@ def define_attribute(model_id: str, target_type: str, key: str, description: str
             """,
             (model_id, target_type, key, description, 1 if is_tag else 0),
         )
-        connection.commit()
 
 
 def delete_attribute_definition(model_id: str, target_type: str, key: str) -> int:
     """Remove a definition from the dictionary; returns number removed."""
-    with get_connection() as connection:
+    with _conn(write=True) as connection:
         cursor = connection.cursor()
         cursor.execute(
             "DELETE FROM model_attribute_definitions "
             "WHERE model_id = ? AND target_type = ? AND key = ?",
             (model_id, target_type, key),
         )
-        connection.commit()
         return int(cursor.rowcount)
 
 
@@ -1314,6 +2005,24 @@ def _resolve_tag_key(connection, model_id: str, target_type: str, key: str) -> N
         )
 
 
+# tags are merged in SQLite with an RFC 7396 patch: {key: value} sets a tag, {key: null} removes it
+_PATCH_TAGS_SQL = {
+    table: (
+        f"UPDATE {table} SET tags_json = json_patch({_JSON_COLUMN.format('tags_json')}, json_object(?, ?)), "
+        f"updated_at = CURRENT_TIMESTAMP WHERE model_id = ? AND id = ? RETURNING {_TABLE_COLUMNS[table]}"
+    )
+    for table in ("model_elements", "model_relationships")
+}
+
+
+def _patch_tags(connection, table: str, model_id: str, row_id: str, key: str, value: Any) -> dict[str, Any] | None:
+    """Set ``key`` to ``value`` (``None`` removes it) in the row's tags; return the updated row, or None if absent."""
+    cursor = connection.cursor()
+    cursor.execute(_PATCH_TAGS_SQL[table], (key, value, model_id, row_id))
+    rows = _row_dicts(cursor)
+    return rows[0] if rows else None
+
+
 def add_element_tag(
     model_id: str,
     element_id: str,
@@ -1324,27 +2033,16 @@ def add_element_tag(
 ) -> dict[str, Any]:
     """Add or update a tag on an element.  The key must exist in the attribute
     dictionary with ``is_tag=True``.  Returns the updated tags dict."""
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
         _resolve_tag_key(connection, model_id, "element", key)
-        cursor = connection.cursor()
-        cursor.execute(
-            "SELECT tags_json FROM model_elements WHERE model_id = ? AND id = ?",
-            (model_id, element_id),
-        )
-        row = cursor.fetchone()
+        row = _patch_tags(connection, "model_elements", model_id, element_id, key, value)
         if row is None:
             raise ModelError(f"Element '{element_id}' not found in model '{model_id}'")
-        tags: dict = json.loads(row[0] or "{}")
-        tags[key] = value
-        cursor.execute(
-            "UPDATE model_elements SET tags_json = ?, updated_at = CURRENT_TIMESTAMP "
-            "WHERE model_id = ? AND id = ?",
-            (json.dumps(tags, ensure_ascii=False), model_id, element_id),
+        version = _create_version(
+            connection, model_id, author, message, [("upsert_element", element_id, row)], model=model
         )
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
-        return {"status": "ok", "element_id": element_id, "tags": tags, "version": version}
+        return {"status": "ok", "element_id": element_id, "tags": row["tags"], "version": version}
 
 
 def remove_element_tag(
@@ -1355,26 +2053,15 @@ def remove_element_tag(
     message: str = "Tag removed",
 ) -> dict[str, Any]:
     """Remove a tag from an element.  No-ops silently if the key is absent."""
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        cursor = connection.cursor()
-        cursor.execute(
-            "SELECT tags_json FROM model_elements WHERE model_id = ? AND id = ?",
-            (model_id, element_id),
-        )
-        row = cursor.fetchone()
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        row = _patch_tags(connection, "model_elements", model_id, element_id, key, None)
         if row is None:
             raise ModelError(f"Element '{element_id}' not found in model '{model_id}'")
-        tags: dict = json.loads(row[0] or "{}")
-        tags.pop(key, None)
-        cursor.execute(
-            "UPDATE model_elements SET tags_json = ?, updated_at = CURRENT_TIMESTAMP "
-            "WHERE model_id = ? AND id = ?",
-            (json.dumps(tags, ensure_ascii=False), model_id, element_id),
+        version = _create_version(
+            connection, model_id, author, message, [("upsert_element", element_id, row)], model=model
         )
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
-        return {"status": "ok", "element_id": element_id, "tags": tags, "version": version}
+        return {"status": "ok", "element_id": element_id, "tags": row["tags"], "version": version}
 
 
 def add_relationship_tag(
@@ -1387,27 +2074,16 @@ def add_relationship_tag(
 ) -> dict[str, Any]:
     """Add or update a tag on a relationship.  The key must exist in the attribute
     dictionary with ``is_tag=True``."""
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
         _resolve_tag_key(connection, model_id, "relationship", key)
-        cursor = connection.cursor()
-        cursor.execute(
-            "SELECT tags_json FROM model_relationships WHERE model_id = ? AND id = ?",
-            (model_id, relationship_id),
-        )
-        row = cursor.fetchone()
+        row = _patch_tags(connection, "model_relationships", model_id, relationship_id, key, value)
         if row is None:
             raise ModelError(f"Relationship '{relationship_id}' not found in model '{model_id}'")
-        tags: dict = json.loads(row[0] or "{}")
-        tags[key] = value
-        cursor.execute(
-            "UPDATE model_relationships SET tags_json = ?, updated_at = CURRENT_TIMESTAMP "
-            "WHERE model_id = ? AND id = ?",
-            (json.dumps(tags, ensure_ascii=False), model_id, relationship_id),
+        version = _create_version(
+            connection, model_id, author, message, [("upsert_relationship", relationship_id, row)], model=model
         )
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
-        return {"status": "ok", "relationship_id": relationship_id, "tags": tags, "version": version}
+        return {"status": "ok", "relationship_id": relationship_id, "tags": row["tags"], "version": version}
 
 
 def remove_relationship_tag(
@@ -1418,31 +2094,56 @@ def remove_relationship_tag(
     message: str = "Tag removed",
 ) -> dict[str, Any]:
     """Remove a tag from a relationship.  No-ops silently if the key is absent."""
-    with get_connection() as connection:
-        _ensure_model_exists(connection, model_id)
-        cursor = connection.cursor()
-        cursor.execute(
-            "SELECT tags_json FROM model_relationships WHERE model_id = ? AND id = ?",
-            (model_id, relationship_id),
-        )
-        row = cursor.fetchone()
+    with _conn(write=True) as connection:
+        model = _ensure_model_exists(connection, model_id)
+        row = _patch_tags(connection, "model_relationships", model_id, relationship_id, key, None)
         if row is None:
             raise ModelError(f"Relationship '{relationship_id}' not found in model '{model_id}'")
-        tags: dict = json.loads(row[0] or "{}")
-        tags.pop(key, None)
-        cursor.execute(
-            "UPDATE model_relationships SET tags_json = ?, updated_at = CURRENT_TIMESTAMP "
-            "WHERE model_id = ? AND id = ?",
-            (json.dumps(tags, ensure_ascii=False), model_id, relationship_id),
+        version = _create_version(
+            connection, model_id, author, message, [("upsert_relationship", relationship_id, row)], model=model
         )
-        version = _create_version(connection, model_id, author, message)
-        connection.commit()
-        return {"status": "ok", "relationship_id": relationship_id, "tags": tags, "version": version}
+        return {"status": "ok", "relationship_id": relationship_id, "tags": row["tags"], "version": version}
+
+
+# operations accepted by apply_operation/batch_apply, keyed by the name the CUD tool resolves each op to
+_OPERATIONS: dict[str, Callable[..., dict[str, Any]]] = {
+    "upsert_element": upsert_model_element,
+    "delete_element": delete_model_element,
+    "upsert_relationship": upsert_model_relationship,
+    "delete_relationship": delete_model_relationship,
+    "add_element_tag": add_element_tag,
+    "remove_element_tag": remove_element_tag,
+    "add_relationship_tag": add_relationship_tag,
+    "remove_relationship_tag": remove_relationship_tag,
+}
 
 
+def apply_operation(operation: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Run one named model write (see ``_OPERATIONS``) with keyword arguments ``kwargs``."""
+    function = _OPERATIONS.get(operation)
+    if function is None:
+        raise ModelError(f"Unknown operation '{operation}'. Allowed: {', '.join(_OPERATIONS)}")
+    return function(**kwargs)
+
+
+def batch_apply(ops: list[tuple[str, dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Apply ``(operation, kwargs)`` pairs in order inside one write transaction.
+
+    Each operation still records its own model version.  The first failure rolls back the whole
+    batch and is re-raised as a ModelError naming the op's index.
+    """
+    results: list[dict[str, Any]] = []
+    with _conn(write=True):
+        for index, (operation, kwargs) in enumerate(ops):
+            try:
+                results.append(apply_operation(operation, kwargs))
+            except (ModelError, sqlite3.Error) as exc:
+                raise ModelError(f"ops[{index}] ({operation}): {exc}") from exc
+    return results
+
 
 def get_lock(model_id: str) -> dict[str, Any]:
-    with get_connection() as connection:
+    with _conn() as connection:
         _ensure_model_exists(connection, model_id)
         cursor = connection.cursor()
         cursor.execute("SELECT owner, acquired_at FROM model_locks WHERE model_id = ?", (model_id,))
@@ -1462,15 +2163,19 @@ def mermaid_view(model_id: str, direction: str = "LR", limit: int = 300) -> str:
     elements = list_model_elements(model_id=model_id, limit=limit)
     relationships = list_model_relationships(model_id=model_id, limit=limit)
 
+    # Mermaid ids are translated once per element; relationship endpoints reuse the mapping and only
+    # translate ids of elements that fell outside the listing limit
+    node_ids = {element["id"]: element["id"].replace("-", "_") for element in elements}
     lines = [f"graph {direction}"]
     for element in elements:
-        node_id = element["id"].replace("-", "_")
         label = (element.get("name") or element["id"]).replace('"', "'")
-        lines.append(f'  {node_id}["{label}\\n<{element["type_name"]}>"]')
+        lines.append(f'  {node_ids[element["id"]]}["{label}\\n<{element["type_name"]}>"]')
 
     for relationship in relationships:
-        src = relationship["source_element_id"].replace("-", "_")
-        tgt = relationship["target_element_id"].replace("-", "_")
+        source_id = relationship["source_element_id"]
+        target_id = relationship["target_element_id"]
+        src = node_ids.get(source_id) or source_id.replace("-", "_")
+        tgt = node_ids.get(target_id) or target_id.replace("-", "_")
         rel_label = relationship["type_name"].replace('"', "'")
         lines.append(f"  {src} -->|{rel_label}| {tgt}")
 
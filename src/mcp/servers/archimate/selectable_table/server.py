@@ -5,12 +5,11 @@ This module does **not** create its own FastMCP instance; instead it re‑uses
 registered on the same server.
 """
 
-import json
-
 # reuse the MCP instance created by the archimate package
-from ..server import mcp
+from ..server import dumps_json, mcp
 
 from .state import VIEW_URI, get_selection
+from ..tools.selectable_table.view import EMBEDDED_VIEW_HTML
 
 
 
@@ -32,7 +31,6 @@ from .state import VIEW_URI, get_selection
 )
 def view() -> str:
     """View HTML resource for the selectable table UI."""
-    from ..tools.selectable_table.view import EMBEDDED_VIEW_HTML
     return EMBEDDED_VIEW_HTML
 
 
@@ -42,7 +40,7 @@ def view() -> str:
 @mcp.resource("data://selectable-table/selection.json", mime_type="application/json")
 def current_selection() -> str:
     """Returns the current selection as JSON."""
-    return json.dumps(get_selection(), ensure_ascii=False)
+    return dumps_json(get_selection())
 
 
 # ---------------------------------------------------------------------------
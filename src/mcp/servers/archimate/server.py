@@ -1,7 +1,7 @@
 """ArchiMate MCP Server – entry point.
 
-This module establishes the FastMCP instance, initializes the database, and
-imports all tools (including the selectable-table interactive view and
+This module establishes the FastMCP instance (whose lifespan initializes the
+databases) and imports all tools (including the selectable-table interactive view and
 selection-handling tools) so that their @mcp.tool() decorators register with
 this server.
 """
@@ -9,12 +9,24 @@ this server.
 from mcp.server.fastmcp import FastMCP
 
 import json
+import sys
 import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib import import_module
 from pathlib import Path
 from typing import Any
 
-from .db import init_db
-from .model_db import init_model_db
+from .db import DB_PATH as METAMODEL_DB_PATH, init_db
+from .model_db import MODEL_DB_PATH, init_model_db
+
+# orjson is an optional speed-up (the ``speedups`` extra); the stdlib encoder produces equivalent JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ----------------------------------------------------------------------------
 # Shared constants and in‑memory state for selectable-table functionality
@@ -26,22 +38,133 @@ MATRIX_VIEW_URI = "ui://selectable-matrix/view.html"
 # exports directory (resolved relative to workspace root, 4 levels above this file)
 EXPORTS_DIR = Path(__file__).resolve().parents[4] / "exports"
 
-_current_selection: list = []
 
-# optional "current model" context used by conversational tools/skills
-CURRENT_MODEL: str | None = None
-LAST_MODEL_MUTATION: dict[str, Any] | None = None
+@dataclass(slots=True, frozen=True)
+class _Mutation:
+    tool: str
+    action: str
+    model_id: str | None
+    at_monotonic: float
+
+
+@dataclass(slots=True)
+class _ServerState:
+    """Process-wide conversational state, read and written through the helpers below."""
+
+    selection: list = field(default_factory=list)
+    # optional "current model" context used by conversational tools/skills
+    current_model: str | None = None
+    last_mutation: _Mutation | None = None
+
+
+_STATE = _ServerState()
+
+# ---------------------------------------------------------------------------
+# response encoding shared by the tools
+# ---------------------------------------------------------------------------
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the stdlib name either way
+if orjson is not None:
+
+    def dumps_json(obj: Any) -> str:
+        """Encode a tool or resource response as UTF-8 JSON text."""
+        return orjson.dumps(obj).decode()
+
+    loads_json = orjson.loads
+else:
+
+    def dumps_json(obj: Any) -> str:
+        """Encode a tool or resource response as UTF-8 JSON text."""
+        return json.dumps(obj, ensure_ascii=False)
+
+    loads_json = json.loads
+
+
+# Payload checks are generated here rather than compiled from JSON Schema (e.g. fastjsonschema): the tools
+# only test presence of a few fields, and the requirements fix the "missing required field '…'" wording.
+def make_required_validator(*fields: str, presence_only: bool = False) -> Callable[[dict[str, Any]], str | None]:
+    """Build a function returning the first of ``fields`` missing from a payload, or None.
+
+    The checks are generated as straight-line code once, at import time of the calling tool, instead
+    of looping over a tuple on every call.  A field counts as missing when it is falsy, or with
+    ``presence_only`` only when the key is absent (for fields such as booleans that may be false).
+    """
+    template = "    if {!r} not in p: return {!r}\n" if presence_only else "    if not p.get({!r}): return {!r}\n"
+    source = "def validator(p):\n" + "".join(template.format(key, key) for key in fields) + "    return None\n"
+    namespace: dict[str, Any] = {}
+    exec(compile(source, f"<required {', '.join(fields)}>", "exec"), namespace)
+    return namespace["validator"]
+
+
+def make_payload_coercer(
+    *,
+    required: tuple[str, ...] = (),
+    ids: tuple[str, ...] = (),
+    optional_str: tuple[str, ...] = (),
+    optional_int: tuple[str, ...] = (),
+    optional_dict: tuple[str, ...] = (),
+    defaults: dict[str, str] | None = None,
+) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """Build a function turning a validated payload into keyword arguments, generated like the validators.
+
+    ``required`` fields become ``str``; ``ids`` become ``str`` when truthy and None otherwise;
+    ``optional_str``/``optional_int`` are converted unless None; ``optional_dict`` fields pass through
+    only when they are dicts; ``defaults`` maps fields to the string used when they are absent.
+    """
+    entries = [f"{key!r}: str(p[{key!r}])" for key in required]
+    entries += [f"{key!r}: str(v) if (v := get({key!r})) else None" for key in ids]
+    entries += [f"{key!r}: str(v) if (v := get({key!r})) is not None else None" for key in optional_str]
+    entries += [f"{key!r}: int(v) if (v := get({key!r})) is not None else None" for key in optional_int]
+    entries += [f"{key!r}: v if isinstance(v := get({key!r}), dict) else None" for key in optional_dict]
+    entries += [f"{key!r}: str(get({key!r}, {default!r}))" for key, default in (defaults or {}).items()]
+    source = (
+        "def coercer(p):\n"
+        "    get = p.get\n"
+        "    return {\n" + "".join(f"        {entry},\n" for entry in entries) + "    }\n"
+    )
+    namespace: dict[str, Any] = {}
+    exec(compile(source, "<payload coercer>", "exec"), namespace)
+    return namespace["coercer"]
+
+
+# the db_info answer only changes when a database file is created or removed, so the encoded text is
+# reused for a short while instead of stat-ing both files and re-encoding on every call
+_DB_INFO_TTL_SECONDS = 1.0
+_DB_INFO_CACHE: tuple[float, str] | None = None
+
+
+def db_info_json() -> str:
+    """Return the encoded response of the tools' ``db_info`` action (database paths and existence)."""
+    global _DB_INFO_CACHE
+    now = time.monotonic()
+    cached = _DB_INFO_CACHE
+    if cached is not None and now - cached[0] < _DB_INFO_TTL_SECONDS:
+        return cached[1]
+    text = dumps_json(
+        {
+            "metamodel_db": {"path": str(METAMODEL_DB_PATH), "exists": METAMODEL_DB_PATH.exists()},
+            "model_db": {"path": str(MODEL_DB_PATH), "exists": MODEL_DB_PATH.exists()},
+        }
+    )
+    _DB_INFO_CACHE = (now, text)
+    return text
+
+
+# clients repeat a handful of action spellings, so the stripped, lowercased form is cached and interned
+@lru_cache(maxsize=128)
+def normalize_action(action: str | None) -> str:
+    """Return ``action`` stripped and lowercased, as the action-style tools compare it."""
+    return sys.intern((action or "").strip().lower())
+
 
 # ---------------------------------------------------------------------------
 # selection helpers (for selectable_table)
 # ---------------------------------------------------------------------------
 def get_selection() -> list:
-    return _current_selection
+    return _STATE.selection
 
 
 def set_selection(selection: list) -> None:
-    global _current_selection
-    _current_selection = selection
+    _STATE.selection = selection
 
 
 # ---------------------------------------------------------------------------
@@ -49,65 +172,55 @@ def set_selection(selection: list) -> None:
 # ---------------------------------------------------------------------------
 def set_current_model(model_id: str) -> None:
     """Remember the given model id for later conversational use."""
-    global CURRENT_MODEL
-    CURRENT_MODEL = model_id
+    _STATE.current_model = model_id
 
 
 def get_current_model() -> str | None:
     """Return the currently remembered model id, or None if none set."""
-    return CURRENT_MODEL
+    return _STATE.current_model
 
 
 def note_model_mutation(tool: str, action: str, model_id: str | None = None) -> None:
     """Record the latest model mutation to support runtime guardrails."""
-    global LAST_MODEL_MUTATION
-    LAST_MODEL_MUTATION = {
-        "tool": tool,
-        "action": action,
-        "model_id": model_id,
-        "at_monotonic": time.monotonic(),
-    }
+    _STATE.last_mutation = _Mutation(tool, action, model_id, time.monotonic())
 
 
 def get_recent_model_mutation(max_age_seconds: int = 90) -> dict[str, Any] | None:
     """Return recent mutation metadata if it happened within max_age_seconds."""
-    if not LAST_MODEL_MUTATION:
+    mutation = _STATE.last_mutation
+    if mutation is None:
         return None
-    age = time.monotonic() - float(LAST_MODEL_MUTATION.get("at_monotonic", 0.0))
+    age = time.monotonic() - mutation.at_monotonic
     if age > max_age_seconds:
         return None
-    result = dict(LAST_MODEL_MUTATION)
-    result["age_seconds"] = round(age, 3)
-    return result
+    return {
+        "tool": mutation.tool,
+        "action": mutation.action,
+        "model_id": mutation.model_id,
+        "age_seconds": round(age, 3),
+    }
 
 
 def clear_recent_model_mutation() -> None:
     """Clear mutation metadata, typically after an explicitly requested post-write diagram export."""
-    global LAST_MODEL_MUTATION
-    LAST_MODEL_MUTATION = None
+    _STATE.last_mutation = None
 
 
 # ---------------------------------------------------------------------------
 # FastMCP instance
 # ---------------------------------------------------------------------------
-mcp = FastMCP("ArchiMate")
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Initialize both databases when the server starts serving rather than when this module is imported.
 
-# ---------------------------------------------------------------------------
-# Initialize metamodel database once on server startup
-# ---------------------------------------------------------------------------
-init_db()
-init_model_db()
+    Both stores also initialize on first use, so importers that never run the server still work.
+    """
+    init_db()
+    init_model_db()
+    yield
 
-# ---------------------------------------------------------------------------
-# Import tool modules so their decorators register with `mcp`
-# ---------------------------------------------------------------------------
-from .tools.archimate_metamodel import tool as _t1  # noqa: E402, F401
-from .tools.archimate_metamodel_enhance import tool as _t2  # noqa: E402, F401
-from .tools.archimate_current_model import tool as _tX  # noqa: E402, F401
-from .tools.archimate_model_management import tool as _t3  # noqa: E402, F401
-from .tools.archimate_attribute_dictionary import tool as _tA  # noqa: E402, F401
-from .tools.archimate_model_query import tool as _t4  # noqa: E402, F401
-from .tools.archimate_model_cud import tool as _t5  # noqa: E402, F401
+
+mcp = FastMCP("ArchiMate", lifespan=_lifespan)
 
 # ---------------------------------------------------------------------------
 # Selectable-table support (resources and selection state)
@@ -115,6 +228,12 @@ from .tools.archimate_model_cud import tool as _t5  # noqa: E402, F401
 
 # state and constants now defined above in this module (see earlier block)
 
+# the view documents are static, so they are resolved once and every fetch returns the same string
+# Resources stay str: FastMCP sends a bytes return as a base64 BlobResourceContents, not as text
+# resources/read has no conditional form (no ETag / If-None-Match), so each read carries the full document
+from .tools.selectable_table.view import EMBEDDED_VIEW_HTML as _TABLE_HTML  # noqa: E402
+from .tools.selectable_matrix.view import EMBEDDED_VIEW_HTML as _MATRIX_HTML  # noqa: E402
+
 
 # resource: HTML view for the selectable table UI
 @mcp.resource(
@@ -132,8 +251,7 @@ from .tools.archimate_model_cud import tool as _t5  # noqa: E402, F401
 )
 def selectable_table_view() -> str:
     """Return the HTML view used by the selectable table tool."""
-    from .tools.selectable_table.view import EMBEDDED_VIEW_HTML
-    return EMBEDDED_VIEW_HTML
+    return _TABLE_HTML
 
 
 # resource: HTML view for the selectable matrix UI
@@ -153,18 +271,41 @@ def selectable_table_view() -> str:
 )
 def selectable_matrix_view() -> str:
     """Return the HTML view used by the selectable matrix tool."""
-    from .tools.selectable_matrix.view import EMBEDDED_VIEW_HTML
-    return EMBEDDED_VIEW_HTML
+    return _MATRIX_HTML
 
 
 # resource: current selection as JSON
 @mcp.resource("data://selectable-table/selection.json", mime_type="application/json")
 def current_selection() -> str:
     """Returns the current selection as JSON."""
-    return json.dumps(get_selection(), ensure_ascii=False)
+    return dumps_json(get_selection())
+
+
+# ---------------------------------------------------------------------------
+# Import tool modules so their decorators register with `mcp`
+# ---------------------------------------------------------------------------
+# Registration stays at import time: clients list tools as soon as the session
+# opens, and each module's cost is dominated by deriving its tool schema, which a
+# lazy stub would have to do as well.  The whole set adds ~45 ms on top of the
+# ~400 ms spent importing the ``mcp`` package itself.
+_TOOL_MODULES = (
+    "archimate_metamodel",
+    "archimate_metamodel_enhance",
+    "archimate_current_model",
+    "archimate_model_management",
+    "archimate_attribute_dictionary",
+    "archimate_model_query",
+    "archimate_model_cud",
+    "selectable_table",
+    "selectable_matrix",
+    "drawio",
+)
+
+
+def _register_tools() -> None:
+    """Import every tool module once so its @mcp.tool() decorators run against `mcp`."""
+    for name in _TOOL_MODULES:
+        import_module(f"{__package__}.tools.{name}.tool")
 
 
-# register the tool itself so its decorator sees the shared mcp
-from .tools.selectable_table import tool as _t6  # noqa: E402, F401
-from .tools.selectable_matrix import tool as _t7  # noqa: E402, F401
-from .tools.drawio import tool as _t8  # noqa: E402, F401
+_register_tools()
@@ -12,12 +12,12 @@ Attribute definitions can be marked with ``is_tag=true`` to designate them as
 ``tag_key`` / ``tag_value`` filters.
 """
 
-import json
+from collections.abc import Callable
 from typing import Any
 
 from mcp import types
 
-from ...server import mcp
+from ...server import dumps_json, loads_json, mcp
 from ...model_db import (
     define_attribute,
     list_attribute_definitions,
@@ -27,6 +27,54 @@ from ...model_db import (
 )
 
 
+def _s(value: Any) -> str:
+    # JSON strings already arrive as str; only other scalars need converting
+    return value if type(value) is str else str(value)
+
+
+def _is_tag(payload: dict[str, Any]) -> bool:
+    is_tag_raw = payload.get("is_tag", False)
+    return bool(is_tag_raw) if not isinstance(is_tag_raw, str) else is_tag_raw.lower() in ("true", "1", "yes")
+
+
+def _define(payload: dict[str, Any]) -> Any:
+    is_tag = _is_tag(payload)
+    define_attribute(
+        model_id=_s(payload["model_id"]),
+        target_type=_s(payload["target_type"]),
+        key=_s(payload["key"]),
+        description=_s(payload.get("description", "")),
+        is_tag=is_tag,
+    )
+    return {"status": "ok", "is_tag": is_tag}
+
+
+def _list(payload: dict[str, Any]) -> Any:
+    return list_attribute_definitions(model_id=_s(payload["model_id"]), target_type=_s(payload["target_type"]))
+
+
+def _list_tags(payload: dict[str, Any]) -> Any:
+    return list_tag_definitions(model_id=_s(payload["model_id"]), target_type=_s(payload["target_type"]))
+
+
+def _delete(payload: dict[str, Any]) -> Any:
+    count = delete_attribute_definition(
+        model_id=_s(payload["model_id"]),
+        target_type=_s(payload["target_type"]),
+        key=_s(payload["key"]),
+    )
+    return {"deleted": count}
+
+
+# action -> (required payload fields, handler returning the JSON-serializable result)
+_SCHEMA: dict[str, tuple[tuple[str, ...], Callable[[dict[str, Any]], Any]]] = {
+    "define": (("model_id", "target_type", "key"), _define),
+    "list": (("model_id", "target_type"), _list),
+    "list_tags": (("model_id", "target_type"), _list_tags),
+    "delete": (("model_id", "target_type", "key"), _delete),
+}
+
+
 @mcp.tool()
 def archimate_attribute_dictionary(action: str, payload_json: str = "{}") -> list[types.TextContent]:
     """Actions:
@@ -37,58 +85,19 @@ def archimate_attribute_dictionary(action: str, payload_json: str = "{}") -> lis
     """
     action = (action or "").strip().lower()
     try:
-        payload: dict[str, Any] = json.loads(payload_json) if payload_json else {}
-    except json.JSONDecodeError as exc:
+        payload: dict[str, Any] = loads_json(payload_json) if payload_json else {}
+    except ValueError as exc:
         return [types.TextContent(type="text", text=f"Error: payload_json invalid – {exc}")]
 
-    try:
-        if action == "define":
-            for key in ("model_id", "target_type", "key"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            is_tag_raw = payload.get("is_tag", False)
-            is_tag = bool(is_tag_raw) if not isinstance(is_tag_raw, str) else is_tag_raw.lower() in ("true", "1", "yes")
-            define_attribute(
-                model_id=str(payload["model_id"]),
-                target_type=str(payload["target_type"]),
-                key=str(payload["key"]),
-                description=str(payload.get("description", "")),
-                is_tag=is_tag,
-            )
-            return [types.TextContent(type="text", text=json.dumps({"status": "ok", "is_tag": is_tag}))]
-
-        if action == "list":
-            for key in ("model_id", "target_type"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            attrs = list_attribute_definitions(
-                model_id=str(payload["model_id"]),
-                target_type=str(payload["target_type"]),
-            )
-            return [types.TextContent(type="text", text=json.dumps(attrs, ensure_ascii=False))]
-
-        if action == "list_tags":
-            for key in ("model_id", "target_type"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            tags = list_tag_definitions(
-                model_id=str(payload["model_id"]),
-                target_type=str(payload["target_type"]),
-            )
-            return [types.TextContent(type="text", text=json.dumps(tags, ensure_ascii=False))]
-
-        if action == "delete":
-            for key in ("model_id", "target_type", "key"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            count = delete_attribute_definition(
-                model_id=str(payload["model_id"]),
-                target_type=str(payload["target_type"]),
-                key=str(payload["key"]),
-            )
-            return [types.TextContent(type="text", text=json.dumps({"deleted": count}))]
-
+    spec = _SCHEMA.get(action)
+    if spec is None:
         return [types.TextContent(type="text", text=f"Error: unknown action '{action}'. Allowed: define, list, list_tags, delete")]
+    required, handler = spec
+    try:
+        missing = next((key for key in required if not payload.get(key)), None)
+        if missing is not None:
+            return [types.TextContent(type="text", text=f"Error: missing required field '{missing}'")]
+        return [types.TextContent(type="text", text=dumps_json(handler(payload)))]
     except ModelError as exc:
         return [types.TextContent(type="text", text=f"Error: {exc}")]
     except Exception as exc:
@@ -5,12 +5,37 @@ state, and later retrieve it.  Skills can use it to avoid passing model_id
 explicitly on every call.
 """
 
-import json
+from collections.abc import Callable
 from typing import Any
 
 from mcp import types
 
-from ...server import mcp, set_current_model, get_current_model
+from ...server import dumps_json, get_current_model, loads_json, mcp, set_current_model
+
+
+def _set(payload: dict[str, Any]) -> Any:
+    model_id = payload["model_id"]
+    set_current_model(str(model_id))
+    return {"model_id": model_id}
+
+
+def _get(payload: dict[str, Any]) -> Any:
+    return {"model_id": get_current_model()}
+
+
+def _find(payload: dict[str, Any]) -> Any:
+    # search for models by name fragment; only id and name are read from the store
+    from ...model_db import list_models_names
+
+    return [{"id": model_id, "name": name} for model_id, name in list_models_names(50, payload["name"])]
+
+
+# action -> (required payload fields, handler returning the JSON-serializable result)
+_SCHEMA: dict[str, tuple[tuple[str, ...], Callable[[dict[str, Any]], Any]]] = {
+    "set": (("model_id",), _set),
+    "get": ((), _get),
+    "find": (("name",), _find),
+}
 
 
 @mcp.tool()
@@ -21,31 +46,15 @@ def archimate_current_model(action: str, payload_json: str = "{}") -> list[types
     """
     action = (action or "").strip().lower()
     try:
-        payload: dict[str, Any] = json.loads(payload_json) if payload_json else {}
-    except json.JSONDecodeError as exc:
+        payload: dict[str, Any] = loads_json(payload_json) if payload_json else {}
+    except ValueError as exc:
         return [types.TextContent(type="text", text=f"Error: payload_json invalid – {exc}")]
 
-    if action == "set":
-        model_id = payload.get("model_id")
-        if not model_id:
-            return [types.TextContent(type="text", text="Error: missing required field 'model_id' for set")]
-        set_current_model(str(model_id))
-        return [types.TextContent(type="text", text=json.dumps({"model_id": model_id}))]
-
-    if action == "get":
-        current = get_current_model()
-        return [types.TextContent(type="text", text=json.dumps({"model_id": current}))]
-
-    if action == "find":
-        # search for models by name fragment
-        name = payload.get("name")
-        if not name:
-            return [types.TextContent(type="text", text="Error: missing required field 'name' for find")]
-        # use the management tool's list_models helper
-        from ...model_db import list_models
-        results = list_models(limit=50, search=name)
-        # return list of {id,name}
-        simple = [{"id": r.get("id"), "name": r.get("name")} for r in results]
-        return [types.TextContent(type="text", text=json.dumps(simple, ensure_ascii=False))]
-
-    return [types.TextContent(type="text", text=f"Error: unknown action '{action}'")]
\ No newline at end of file
+    spec = _SCHEMA.get(action)
+    if spec is None:
+        return [types.TextContent(type="text", text=f"Error: unknown action '{action}'")]
+    required, handler = spec
+    missing = next((key for key in required if not payload.get(key)), None)
+    if missing is not None:
+        return [types.TextContent(type="text", text=f"Error: missing required field '{missing}' for {action}")]
+    return [types.TextContent(type="text", text=dumps_json(handler(payload)))]
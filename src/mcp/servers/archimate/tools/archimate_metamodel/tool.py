@@ -2,30 +2,175 @@
 
 from __future__ import annotations
 
-import json
+from functools import lru_cache
+from typing import Any
+
 from mcp import types
 
-from ...db import DB_PATH, get_connection
-from ...server import mcp
+from ...db import DB_PATH, generation, get_connection
+from ...server import db_info_json, dumps_json, loads_json, mcp
+
+
+_JSON_COLUMNS = frozenset(("attributes_json", "constraints_json"))
 
 
 def _rows_to_dicts(cursor) -> list[dict]:
     columns = [col[0] for col in cursor.description]
-    result = []
-    for row in cursor.fetchall():
-        item = dict(zip(columns, row))
-        for key in ("attributes_json", "constraints_json"):
-            if key in item and isinstance(item[key], str):
+    # resolve which positions need decoding once per result set instead of probing every row's dict
+    json_positions = [i for i, column in enumerate(columns) if column in _JSON_COLUMNS]
+    directed_position = columns.index("directed") if "directed" in columns else None
+    rows = cursor.fetchall()
+    result: list = [None] * len(rows)
+    for index, row in enumerate(rows):
+        values = list(row)
+        for position in json_positions:
+            if isinstance(values[position], str):
                 try:
-                    item[key] = json.loads(item[key])
-                except json.JSONDecodeError:
+                    values[position] = loads_json(values[position])
+                except ValueError:
                     pass
-        if "directed" in item:
-            item["directed"] = bool(item["directed"])
-        result.append(item)
+        if directed_position is not None:
+            values[directed_position] = bool(values[directed_position])
+        result[index] = dict(zip(columns, values))
     return result
 
 
+# Listing statements keyed by (filter given, search given); built once so the same SQL text reaches
+# SQLite's statement cache on every call.  Parameters are named (:filter, :q, :limit) so the search
+# pattern is bound once however often the statement references it.
+# Names are declared COLLATE NOCASE and layer/category have NOCASE indexes, so the comparisons need no
+# lower() wrappers; LIKE is already case-insensitive for ASCII.
+_SEARCH_NAME_OR_DEFINITION = "(name LIKE :q OR definition LIKE :q)"
+
+
+def _listing_sql(table: str, filter_column: str, order_by: str) -> dict[tuple[bool, bool], str]:
+    base = f"SELECT * FROM {table}"
+    tail = f" ORDER BY {order_by} LIMIT :limit"
+    where_filter = f"{filter_column} = :filter COLLATE NOCASE"
+    return {
+        (False, False): base + tail,
+        (True, False): f"{base} WHERE {where_filter}{tail}",
+        (False, True): f"{base} WHERE {_SEARCH_NAME_OR_DEFINITION}{tail}",
+        (True, True): f"{base} WHERE {where_filter} AND {_SEARCH_NAME_OR_DEFINITION}{tail}",
+    }
+
+
+_ELEMENT_SQL = _listing_sql("elements", "layer", "layer, name")
+_RELATIONSHIP_SQL = _listing_sql("relationships", "category", "category, name")
+_RULES_SQL = {
+    False: "SELECT rule_type, source, relationship, target, notes FROM metamodel_rules"
+    " ORDER BY rule_type, source LIMIT :limit",
+    True: "SELECT rule_type, source, relationship, target, notes FROM metamodel_rules"
+    " WHERE source LIKE :q OR target LIKE :q OR notes LIKE :q"
+    " ORDER BY rule_type, source LIMIT :limit",
+}
+
+
+def _listing_params(filter_value: str | None, search: str | None, limit: int) -> dict[str, str | int | None]:
+    # statements that lack a placeholder simply ignore its key
+    return {"filter": filter_value, "q": f"%{search}%" if search else None, "limit": limit}
+
+
+class _QueryError(ValueError):
+    """Raised for a rejected query so the message is returned to the caller but never cached."""
+
+
+def _overview(cursor, name, layer, category, search, limit) -> Any:
+    cursor.execute("SELECT key, value FROM metamodel_info ORDER BY key")
+    metadata = {k: v for k, v in cursor.fetchall()}
+
+    cursor.execute(
+        "SELECT (SELECT COUNT(*) FROM elements), (SELECT COUNT(*) FROM relationships),"
+        " (SELECT COUNT(*) FROM metamodel_rules)"
+    )
+    element_count, relationship_count, rule_count = cursor.fetchone()
+
+    cursor.execute("SELECT DISTINCT layer FROM elements ORDER BY layer")
+    layers = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute("SELECT DISTINCT category FROM relationships ORDER BY category")
+    categories = [row[0] for row in cursor.fetchall()]
+
+    return {
+        "db_path": str(DB_PATH),
+        "metadata": metadata,
+        "counts": {
+            "elements": element_count,
+            "relationships": relationship_count,
+            "rules": rule_count,
+        },
+        "layers": layers,
+        "relationship_categories": categories,
+    }
+
+
+def _elements(cursor, name, layer, category, search, limit) -> Any:
+    cursor.execute(_ELEMENT_SQL[bool(layer), bool(search)], _listing_params(layer, search, limit))
+    return _rows_to_dicts(cursor)
+
+
+def _relationships(cursor, name, layer, category, search, limit) -> Any:
+    cursor.execute(_RELATIONSHIP_SQL[bool(category), bool(search)], _listing_params(category, search, limit))
+    return _rows_to_dicts(cursor)
+
+
+def _element(cursor, name, layer, category, search, limit) -> Any:
+    if not name:
+        raise _QueryError("name is required for query_type='element'")
+    cursor.execute("SELECT * FROM elements WHERE name = ?", (name,))
+    rows = _rows_to_dicts(cursor)
+    if not rows:
+        raise _QueryError(f"element '{name}' not found")
+    return rows[0]
+
+
+def _relationship(cursor, name, layer, category, search, limit) -> Any:
+    if not name:
+        raise _QueryError("name is required for query_type='relationship'")
+    cursor.execute("SELECT * FROM relationships WHERE name = ?", (name,))
+    rows = _rows_to_dicts(cursor)
+    if not rows:
+        raise _QueryError(f"relationship '{name}' not found")
+    return rows[0]
+
+
+def _rules(cursor, name, layer, category, search, limit) -> Any:
+    cursor.execute(_RULES_SQL[bool(search)], _listing_params(None, search, limit))
+    return _rows_to_dicts(cursor)
+
+
+# query_type -> handler(cursor, name, layer, category, search, limit) returning the response payload;
+# db_info is answered by the tool itself because it is never cached
+_QUERIES = {
+    "overview": _overview,
+    "elements": _elements,
+    "relationships": _relationships,
+    "element": _element,
+    "relationship": _relationship,
+    "rules": _rules,
+}
+
+
+# The metamodel only changes through db.py writers, which advance db.generation(); keying on it lets
+# repeated lookups within a conversation reuse the encoded response until the next write.
+@lru_cache(maxsize=256)
+def _query_metamodel(
+    metamodel_generation: int,
+    query_type: str,
+    name: str | None,
+    layer: str | None,
+    category: str | None,
+    search: str | None,
+    limit: int,
+) -> str:
+    handler = _QUERIES.get(query_type)
+    if handler is None:
+        allowed = ["db_info", *_QUERIES]
+        raise _QueryError(f"unknown query_type '{query_type}'. Allowed values: {', '.join(allowed)}")
+    with get_connection() as connection:
+        return dumps_json(handler(connection.cursor(), name, layer, category, search, limit))
+
+
 @mcp.tool()
 def archimate_metamodel_info(
     query_type: str = "overview",
@@ -50,121 +195,10 @@ def archimate_metamodel_info(
     limit = max(1, min(int(limit), 500))
 
     if query_type == "db_info":
-        from ...model_db import MODEL_DB_PATH
-
-        payload = {
-            "metamodel_db": {"path": str(DB_PATH), "exists": DB_PATH.exists()},
-            "model_db": {"path": str(MODEL_DB_PATH), "exists": MODEL_DB_PATH.exists()},
-        }
-        return [types.TextContent(type="text", text=json.dumps(payload, ensure_ascii=False))]
+        return [types.TextContent(type="text", text=db_info_json())]
 
-    with get_connection() as connection:
-        cursor = connection.cursor()
-
-        if query_type == "overview":
-            cursor.execute("SELECT key, value FROM metamodel_info ORDER BY key")
-            metadata = {k: v for k, v in cursor.fetchall()}
-
-            cursor.execute("SELECT COUNT(*) FROM elements")
-            element_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM relationships")
-            relationship_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM metamodel_rules")
-            rule_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT DISTINCT layer FROM elements ORDER BY layer")
-            layers = [row[0] for row in cursor.fetchall()]
-
-            cursor.execute("SELECT DISTINCT category FROM relationships ORDER BY category")
-            categories = [row[0] for row in cursor.fetchall()]
-
-            payload = {
-                "db_path": str(DB_PATH),
-                "metadata": metadata,
-                "counts": {
-                    "elements": element_count,
-                    "relationships": relationship_count,
-                    "rules": rule_count,
-                },
-                "layers": layers,
-                "relationship_categories": categories,
-            }
-            return [types.TextContent(type="text", text=json.dumps(payload, ensure_ascii=False))]
-
-        if query_type == "elements":
-            sql = "SELECT * FROM elements"
-            clauses = []
-            params: list[str | int] = []
-            if layer:
-                clauses.append("lower(layer) = lower(?)")
-                params.append(layer)
-            if search:
-                clauses.append("(lower(name) LIKE lower(?) OR lower(definition) LIKE lower(?))")
-                like = f"%{search}%"
-                params.extend([like, like])
-            if clauses:
-                sql += " WHERE " + " AND ".join(clauses)
-            sql += " ORDER BY layer, name LIMIT ?"
-            params.append(limit)
-
-            cursor.execute(sql, params)
-            return [types.TextContent(type="text", text=json.dumps(_rows_to_dicts(cursor), ensure_ascii=False))]
-
-        if query_type == "relationships":
-            sql = "SELECT * FROM relationships"
-            clauses = []
-            params: list[str | int] = []
-            if category:
-                clauses.append("lower(category) = lower(?)")
-                params.append(category)
-            if search:
-                clauses.append("(lower(name) LIKE lower(?) OR lower(definition) LIKE lower(?))")
-                like = f"%{search}%"
-                params.extend([like, like])
-            if clauses:
-                sql += " WHERE " + " AND ".join(clauses)
-            sql += " ORDER BY category, name LIMIT ?"
-            params.append(limit)
-
-            cursor.execute(sql, params)
-            return [types.TextContent(type="text", text=json.dumps(_rows_to_dicts(cursor), ensure_ascii=False))]
-
-        if query_type == "element":
-            if not name:
-                return [types.TextContent(type="text", text="Error: name is required for query_type='element'")]
-            cursor.execute("SELECT * FROM elements WHERE lower(name) = lower(?)", (name,))
-            rows = _rows_to_dicts(cursor)
-            if not rows:
-                return [types.TextContent(type="text", text=f"Error: element '{name}' not found")]
-            return [types.TextContent(type="text", text=json.dumps(rows[0], ensure_ascii=False))]
-
-        if query_type == "relationship":
-            if not name:
-                return [types.TextContent(type="text", text="Error: name is required for query_type='relationship'")]
-            cursor.execute("SELECT * FROM relationships WHERE lower(name) = lower(?)", (name,))
-            rows = _rows_to_dicts(cursor)
-            if not rows:
-                return [types.TextContent(type="text", text=f"Error: relationship '{name}' not found")]
-            return [types.TextContent(type="text", text=json.dumps(rows[0], ensure_ascii=False))]
-
-        if query_type == "rules":
-            sql = "SELECT rule_type, source, relationship, target, notes FROM metamodel_rules"
-            params: list[str | int] = []
-            if search:
-                sql += " WHERE lower(source) LIKE lower(?) OR lower(target) LIKE lower(?) OR lower(notes) LIKE lower(?)"
-                like = f"%{search}%"
-                params.extend([like, like, like])
-            sql += " ORDER BY rule_type, source LIMIT ?"
-            params.append(limit)
-            cursor.execute(sql, params)
-            return [types.TextContent(type="text", text=json.dumps(_rows_to_dicts(cursor), ensure_ascii=False))]
-
-    allowed = ["db_info", "overview", "elements", "relationships", "element", "relationship", "rules"]
-    return [
-        types.TextContent(
-            type="text",
-            text=f"Error: unknown query_type '{query_type}'. Allowed values: {', '.join(allowed)}",
-        )
-    ]
+    try:
+        text = _query_metamodel(generation(), query_type, name, layer, category, search, limit)
+    except _QueryError as exc:
+        text = f"Error: {exc}"
+    return [types.TextContent(type="text", text=text)]
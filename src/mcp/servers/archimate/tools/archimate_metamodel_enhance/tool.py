@@ -2,14 +2,157 @@
 
 from __future__ import annotations
 
-import json
+from collections.abc import Callable
 from typing import Any
 
 from mcp import types
 
-from ...db import DB_PATH as METAMODEL_DB_PATH, add_annotation, add_rule, delete_annotation, delete_rule, get_annotations, upsert_element, upsert_relationship
-from ...model_db import MODEL_DB_PATH
-from ...server import mcp
+from ...db import add_annotation, add_rule, delete_annotation, delete_rule, get_annotations, upsert_element, upsert_relationship
+from ...server import db_info_json, dumps_json, loads_json, make_required_validator, mcp, normalize_action
+
+
+_TC = types.TextContent
+
+
+def _text(text: str) -> list[types.TextContent]:
+    return [_TC(type="text", text=text)]
+
+
+def _error(message: str) -> list[types.TextContent]:
+    return [_TC(type="text", text=f"Error: {message}")]
+
+
+def _missing(payload: dict[str, Any], check: Callable[[dict[str, Any]], str | None]) -> list[types.TextContent] | None:
+    missing = check(payload)
+    return None if missing is None else _error(f"missing required field '{missing}'")
+
+
+# required-field checks, generated once per action (see server.make_required_validator)
+_ELEMENT_FIELDS = make_required_validator("name", "layer", "aspect", "definition")
+# directed may legitimately be false, so only presence is required for relationships
+_RELATIONSHIP_FIELDS = make_required_validator("name", "category", "directed", "definition", presence_only=True)
+_RULE_FIELDS = make_required_validator("rule_type", "source", "relationship", "target", "notes")
+_ANNOTATION_FIELDS = make_required_validator("target_type", "target_name", "note")
+
+
+def _optional_str(payload: dict[str, Any], key: str) -> str | None:
+    return str(payload.get(key)) if payload.get(key) is not None else None
+
+
+def _handle_db_info(payload: dict[str, Any]) -> list[types.TextContent]:
+    return _text(db_info_json())
+
+
+def _handle_upsert_element(payload: dict[str, Any]) -> list[types.TextContent]:
+    error = _missing(payload, _ELEMENT_FIELDS)
+    if error:
+        return error
+    status = upsert_element(
+        name=str(payload["name"]),
+        layer=str(payload["layer"]),
+        aspect=str(payload["aspect"]),
+        definition=str(payload["definition"]),
+        attributes=payload.get("attributes") if isinstance(payload.get("attributes"), dict) else None,
+        constraints=payload.get("constraints") if isinstance(payload.get("constraints"), list) else None,
+    )
+    return _text(dumps_json({"status": status, "entity": "element", "name": payload["name"]}))
+
+
+def _handle_upsert_relationship(payload: dict[str, Any]) -> list[types.TextContent]:
+    error = _missing(payload, _RELATIONSHIP_FIELDS)
+    if error:
+        return error
+    status = upsert_relationship(
+        name=str(payload["name"]),
+        category=str(payload["category"]),
+        directed=bool(payload["directed"]),
+        definition=str(payload["definition"]),
+        attributes=payload.get("attributes") if isinstance(payload.get("attributes"), dict) else None,
+        constraints=payload.get("constraints") if isinstance(payload.get("constraints"), list) else None,
+    )
+    return _text(dumps_json({"status": status, "entity": "relationship", "name": payload["name"]}))
+
+
+def _handle_add_rule(payload: dict[str, Any]) -> list[types.TextContent]:
+    error = _missing(payload, _RULE_FIELDS)
+    if error:
+        return error
+    rule_id = add_rule(
+        rule_type=str(payload["rule_type"]),
+        source=str(payload["source"]),
+        relationship=str(payload["relationship"]),
+        target=str(payload["target"]),
+        notes=str(payload["notes"]),
+    )
+    return _text(dumps_json({"status": "stored", "entity": "rule", "id": rule_id}))
+
+
+def _handle_add_annotation(payload: dict[str, Any]) -> list[types.TextContent]:
+    error = _missing(payload, _ANNOTATION_FIELDS)
+    if error:
+        return error
+    annotation_id = add_annotation(
+        target_type=str(payload["target_type"]),
+        target_name=str(payload["target_name"]),
+        note=str(payload["note"]),
+        source=str(payload.get("source", "user")),
+    )
+    return _text(dumps_json({"status": "stored", "entity": "annotation", "id": annotation_id}))
+
+
+def _handle_list_annotations(payload: dict[str, Any]) -> list[types.TextContent]:
+    rows = get_annotations(
+        target_type=_optional_str(payload, "target_type"),
+        target_name=_optional_str(payload, "target_name"),
+        limit=int(payload.get("limit", 100)),
+    )
+    return _text(dumps_json(rows))
+
+
+def _handle_delete_annotation(payload: dict[str, Any]) -> list[types.TextContent]:
+    deleted = delete_annotation(
+        annotation_id=int(payload["id"]) if payload.get("id") is not None else None,
+        target_type=_optional_str(payload, "target_type"),
+        target_name=_optional_str(payload, "target_name"),
+        note=_optional_str(payload, "note"),
+        source=_optional_str(payload, "source"),
+    )
+    if deleted == 0 and payload.get("id") is None and not any(
+        payload.get(k) is not None for k in ("target_type", "target_name", "note", "source")
+    ):
+        return _error("delete_annotation requires id or at least one filter field")
+    return _text(dumps_json({"status": "deleted", "entity": "annotation", "count": deleted}))
+
+
+def _handle_delete_rule(payload: dict[str, Any]) -> list[types.TextContent]:
+    deleted = delete_rule(
+        rule_id=int(payload["id"]) if payload.get("id") is not None else None,
+        rule_type=_optional_str(payload, "rule_type"),
+        source=_optional_str(payload, "source"),
+        relationship=_optional_str(payload, "relationship"),
+        target=_optional_str(payload, "target"),
+        notes=_optional_str(payload, "notes"),
+    )
+    if deleted == 0 and payload.get("id") is None and not any(
+        payload.get(k) is not None for k in ("rule_type", "source", "relationship", "target", "notes")
+    ):
+        return _error("delete_rule requires id or at least one filter field")
+    return _text(dumps_json({"status": "deleted", "entity": "rule", "count": deleted}))
+
+
+# action -> handler(payload); insertion order is the order reported for an unknown action
+_HANDLERS: dict[str, Callable[[dict[str, Any]], list[types.TextContent]]] = {
+    "db_info": _handle_db_info,
+    "upsert_element": _handle_upsert_element,
+    "upsert_relationship": _handle_upsert_relationship,
+    "add_rule": _handle_add_rule,
+    "add_annotation": _handle_add_annotation,
+    "list_annotations": _handle_list_annotations,
+    "delete_annotation": _handle_delete_annotation,
+    "delete_rule": _handle_delete_rule,
+}
+# joined once for the unknown-action error
+_ALLOWED_STR = ", ".join(_HANDLERS)
 
 
 @mcp.tool()
@@ -39,127 +182,16 @@ def archimate_metamodel_enhance(
             - delete_rule:
                 {"id": int? , "rule_type": str?, "source": str?, "relationship": str?, "target": str?, "notes": str?}
     """
-    action = (action or "").strip().lower()
+    action = normalize_action(action)
     try:
-        payload: dict[str, Any] = json.loads(payload_json) if payload_json else {}
-    except json.JSONDecodeError as exc:
-        return [types.TextContent(type="text", text=f"Error: payload_json is invalid JSON – {exc}")]
+        payload: dict[str, Any] = loads_json(payload_json) if payload_json else {}
+    except ValueError as exc:
+        return _error(f"payload_json is invalid JSON – {exc}")
 
+    handler = _HANDLERS.get(action)
+    if handler is None:
+        return _error(f"unknown action '{action}'. Allowed: {_ALLOWED_STR}")
     try:
-        if action == "db_info":
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(
-                        {
-                            "metamodel_db": {"path": str(METAMODEL_DB_PATH), "exists": METAMODEL_DB_PATH.exists()},
-                            "model_db": {"path": str(MODEL_DB_PATH), "exists": MODEL_DB_PATH.exists()},
-                        },
-                        ensure_ascii=False,
-                    ),
-                )
-            ]
-
-        if action == "upsert_element":
-            for key in ("name", "layer", "aspect", "definition"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            status = upsert_element(
-                name=str(payload["name"]),
-                layer=str(payload["layer"]),
-                aspect=str(payload["aspect"]),
-                definition=str(payload["definition"]),
-                attributes=payload.get("attributes") if isinstance(payload.get("attributes"), dict) else None,
-                constraints=payload.get("constraints") if isinstance(payload.get("constraints"), list) else None,
-            )
-            return [types.TextContent(type="text", text=json.dumps({"status": status, "entity": "element", "name": payload["name"]}, ensure_ascii=False))]
-
-        if action == "upsert_relationship":
-            for key in ("name", "category", "directed", "definition"):
-                if key not in payload:
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            status = upsert_relationship(
-                name=str(payload["name"]),
-                category=str(payload["category"]),
-                directed=bool(payload["directed"]),
-                definition=str(payload["definition"]),
-                attributes=payload.get("attributes") if isinstance(payload.get("attributes"), dict) else None,
-                constraints=payload.get("constraints") if isinstance(payload.get("constraints"), list) else None,
-            )
-            return [types.TextContent(type="text", text=json.dumps({"status": status, "entity": "relationship", "name": payload["name"]}, ensure_ascii=False))]
-
-        if action == "add_rule":
-            for key in ("rule_type", "source", "relationship", "target", "notes"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            rule_id = add_rule(
-                rule_type=str(payload["rule_type"]),
-                source=str(payload["source"]),
-                relationship=str(payload["relationship"]),
-                target=str(payload["target"]),
-                notes=str(payload["notes"]),
-            )
-            return [types.TextContent(type="text", text=json.dumps({"status": "stored", "entity": "rule", "id": rule_id}, ensure_ascii=False))]
-
-        if action == "add_annotation":
-            for key in ("target_type", "target_name", "note"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            annotation_id = add_annotation(
-                target_type=str(payload["target_type"]),
-                target_name=str(payload["target_name"]),
-                note=str(payload["note"]),
-                source=str(payload.get("source", "user")),
-            )
-            return [types.TextContent(type="text", text=json.dumps({"status": "stored", "entity": "annotation", "id": annotation_id}, ensure_ascii=False))]
-
-        if action == "list_annotations":
-            rows = get_annotations(
-                target_type=str(payload.get("target_type")) if payload.get("target_type") is not None else None,
-                target_name=str(payload.get("target_name")) if payload.get("target_name") is not None else None,
-                limit=int(payload.get("limit", 100)),
-            )
-            return [types.TextContent(type="text", text=json.dumps(rows, ensure_ascii=False))]
-
-        if action == "delete_annotation":
-            deleted = delete_annotation(
-                annotation_id=int(payload["id"]) if payload.get("id") is not None else None,
-                target_type=str(payload.get("target_type")) if payload.get("target_type") is not None else None,
-                target_name=str(payload.get("target_name")) if payload.get("target_name") is not None else None,
-                note=str(payload.get("note")) if payload.get("note") is not None else None,
-                source=str(payload.get("source")) if payload.get("source") is not None else None,
-            )
-            if deleted == 0 and payload.get("id") is None and not any(
-                payload.get(k) is not None for k in ("target_type", "target_name", "note", "source")
-            ):
-                return [types.TextContent(type="text", text="Error: delete_annotation requires id or at least one filter field")]
-            return [types.TextContent(type="text", text=json.dumps({"status": "deleted", "entity": "annotation", "count": deleted}, ensure_ascii=False))]
-
-        if action == "delete_rule":
-            deleted = delete_rule(
-                rule_id=int(payload["id"]) if payload.get("id") is not None else None,
-                rule_type=str(payload.get("rule_type")) if payload.get("rule_type") is not None else None,
-                source=str(payload.get("source")) if payload.get("source") is not None else None,
-                relationship=str(payload.get("relationship")) if payload.get("relationship") is not None else None,
-                target=str(payload.get("target")) if payload.get("target") is not None else None,
-                notes=str(payload.get("notes")) if payload.get("notes") is not None else None,
-            )
-            if deleted == 0 and payload.get("id") is None and not any(
-                payload.get(k) is not None for k in ("rule_type", "source", "relationship", "target", "notes")
-            ):
-                return [types.TextContent(type="text", text="Error: delete_rule requires id or at least one filter field")]
-            return [types.TextContent(type="text", text=json.dumps({"status": "deleted", "entity": "rule", "count": deleted}, ensure_ascii=False))]
-
-        allowed = [
-            "db_info",
-            "upsert_element",
-            "upsert_relationship",
-            "add_rule",
-            "add_annotation",
-            "list_annotations",
-            "delete_annotation",
-            "delete_rule",
-        ]
-        return [types.TextContent(type="text", text=f"Error: unknown action '{action}'. Allowed: {', '.join(allowed)}")]
+        return handler(payload)
     except Exception as exc:
-        return [types.TextContent(type="text", text=f"Error: {exc}")]
+        return _error(str(exc))
@@ -2,25 +2,269 @@
 
 from __future__ import annotations
 
-import json
+from collections.abc import Callable
 from typing import Any
 
 from mcp import types
 
-from ...db import DB_PATH as METAMODEL_DB_PATH
-from ...model_db import (
-    MODEL_DB_PATH,
-    ModelError,
-    add_element_tag,
-    add_relationship_tag,
-    delete_model_element,
-    delete_model_relationship,
-    remove_element_tag,
-    remove_relationship_tag,
-    upsert_model_element,
-    upsert_model_relationship,
+from ...model_db import apply_operation, batch_apply
+from ...server import (
+    db_info_json,
+    dumps_json,
+    loads_json,
+    make_payload_coercer,
+    make_required_validator,
+    mcp,
+    normalize_action,
+    note_model_mutation,
 )
-from ...server import mcp, note_model_mutation
+
+
+class _PayloadError(ValueError):
+    """A payload rejected before any write; its message is returned as ``Error: ...``."""
+
+
+# required-field checks, generated once per field set (see server.make_required_validator)
+_ELEMENT_FIELDS = make_required_validator("model_id", "type_name", "name")
+_ELEMENT_KEY_FIELDS = make_required_validator("model_id", "element_id")
+_RELATIONSHIP_FIELDS = make_required_validator("model_id", "type_name", "source_element_id", "target_element_id")
+_RELATIONSHIP_KEY_FIELDS = make_required_validator("model_id", "relationship_id")
+_TAG_FIELDS = make_required_validator("model_id", "key")
+
+
+def _require(payload: dict[str, Any], check: Callable[[dict[str, Any]], str | None]) -> None:
+    missing = check(payload)
+    if missing is not None:
+        raise _PayloadError(f"missing required field '{missing}'")
+
+
+_TC = types.TextContent
+
+
+def _text(text: str) -> list[types.TextContent]:
+    return [_TC(type="text", text=text)]
+
+
+def _error(message: str) -> list[types.TextContent]:
+    return [_TC(type="text", text=f"Error: {message}")]
+
+
+# ---------------------------------------------------------------------------
+# preparers: validate one payload and map it to a model_db.apply_operation name and kwargs
+# ---------------------------------------------------------------------------
+# payload -> kwargs conversions, generated once per operation (see server.make_payload_coercer)
+_ELEMENT_UPSERT = make_payload_coercer(
+    required=("model_id", "type_name", "name"),
+    ids=("element_id",),
+    optional_str=("valid_from", "valid_to"),
+    optional_int=("expected_version",),
+    optional_dict=("attributes",),
+    defaults={"author": "system", "message": "Element upserted"},
+)
+_ELEMENT_DELETE = make_payload_coercer(
+    required=("model_id", "element_id"),
+    optional_int=("expected_version",),
+    defaults={"author": "system", "message": "Element deleted"},
+)
+_RELATIONSHIP_UPSERT = make_payload_coercer(
+    required=("model_id", "type_name", "source_element_id", "target_element_id"),
+    ids=("relationship_id",),
+    optional_str=("valid_from", "valid_to"),
+    optional_int=("expected_version",),
+    optional_dict=("attributes",),
+    defaults={"name": "", "author": "system", "message": "Relationship upserted"},
+)
+_RELATIONSHIP_DELETE = make_payload_coercer(
+    required=("model_id", "relationship_id"),
+    optional_int=("expected_version",),
+    defaults={"author": "system", "message": "Relationship deleted"},
+)
+_TAG_ADD = make_payload_coercer(
+    required=("model_id", "key"),
+    defaults={"author": "system", "message": "Tag added", "value": ""},
+)
+_TAG_REMOVE = make_payload_coercer(
+    required=("model_id", "key"),
+    defaults={"author": "system", "message": "Tag removed"},
+)
+
+
+def _prepare_create_element(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    _require(payload, _ELEMENT_FIELDS)
+    return "upsert_element", _ELEMENT_UPSERT(payload)
+
+
+def _prepare_update_element(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    _require(payload, _ELEMENT_FIELDS)
+    if not payload.get("element_id"):
+        raise _PayloadError("update_element requires 'element_id'")
+    return "upsert_element", _ELEMENT_UPSERT(payload)
+
+
+def _prepare_delete_element(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    _require(payload, _ELEMENT_KEY_FIELDS)
+    return "delete_element", _ELEMENT_DELETE(payload)
+
+
+def _prepare_create_relationship(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    _require(payload, _RELATIONSHIP_FIELDS)
+    return "upsert_relationship", _RELATIONSHIP_UPSERT(payload)
+
+
+def _prepare_update_relationship(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    _require(payload, _RELATIONSHIP_FIELDS)
+    if not payload.get("relationship_id"):
+        raise _PayloadError("update_relationship requires 'relationship_id'")
+    return "upsert_relationship", _RELATIONSHIP_UPSERT(payload)
+
+
+def _prepare_delete_relationship(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    _require(payload, _RELATIONSHIP_KEY_FIELDS)
+    return "delete_relationship", _RELATIONSHIP_DELETE(payload)
+
+
+def _tag_operation(
+    action: str, payload: dict[str, Any], coerce: Callable[[dict[str, Any]], dict[str, Any]]
+) -> tuple[str, dict[str, Any]]:
+    _require(payload, _TAG_FIELDS)
+    element_id = payload.get("element_id")
+    relationship_id = payload.get("relationship_id")
+    if not element_id and not relationship_id:
+        raise _PayloadError(f"{action} requires 'element_id' or 'relationship_id'")
+    if element_id and relationship_id:
+        raise _PayloadError(f"{action} accepts either 'element_id' or 'relationship_id', not both")
+    kwargs = coerce(payload)
+    if element_id:
+        kwargs["element_id"] = str(element_id)
+    else:
+        kwargs["relationship_id"] = str(relationship_id)
+    verb = action.split("_", 1)[0]
+    return f"{verb}_{'element' if element_id else 'relationship'}_tag", kwargs
+
+
+def _prepare_add_tag(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    return _tag_operation("add_tag", payload, _TAG_ADD)
+
+
+def _prepare_remove_tag(payload: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    return _tag_operation("remove_tag", payload, _TAG_REMOVE)
+
+
+# write action (full name or short alias) -> (canonical action, preparer)
+_WRITES: dict[str, tuple[str, Callable[[dict[str, Any]], tuple[str, dict[str, Any]]]]] = {
+    "create_element": ("create_element", _prepare_create_element),
+    "update_element": ("update_element", _prepare_update_element),
+    "delete_element": ("delete_element", _prepare_delete_element),
+    "create_relationship": ("create_relationship", _prepare_create_relationship),
+    "update_relationship": ("update_relationship", _prepare_update_relationship),
+    "delete_relationship": ("delete_relationship", _prepare_delete_relationship),
+    "add_tag": ("add_tag", _prepare_add_tag),
+    "remove_tag": ("remove_tag", _prepare_remove_tag),
+}
+for _alias, _full in (
+    ("create_el", "create_element"),
+    ("update_el", "update_element"),
+    ("delete_el", "delete_element"),
+    ("create_rel", "create_relationship"),
+    ("update_rel", "update_relationship"),
+    ("delete_rel", "delete_relationship"),
+):
+    _WRITES[_alias] = _WRITES[_full]
+
+
+# ---------------------------------------------------------------------------
+# handlers: one per action, each returning the tool response
+# ---------------------------------------------------------------------------
+def _handle_db_info(payload: dict[str, Any]) -> list[types.TextContent]:
+    return _text(db_info_json())
+
+
+def _write_handler(action: str) -> Callable[[dict[str, Any]], list[types.TextContent]]:
+    canonical, prepare = _WRITES[action]
+
+    # Every write goes through here, so the module globals it calls are bound as keyword-only defaults
+    # (local loads instead of global lookups).  The tool function itself cannot do this: FastMCP
+    # rejects parameters starting with '_' when it derives the tool schema.
+    def handle(
+        payload: dict[str, Any],
+        *,
+        _apply=apply_operation,
+        _note=note_model_mutation,
+        _dumps=dumps_json,
+        _text=_text,
+    ) -> list[types.TextContent]:
+        operation, kwargs = prepare(payload)
+        result = _apply(operation, kwargs)
+        _note("archimate_model_cud", canonical, kwargs["model_id"])
+        return _text(_dumps(result))
+
+    return handle
+
+
+def _prepare_batch(payload: dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+    """Validate every op of a batch up front so a bad op rejects the batch before anything is written."""
+    ops = payload.get("ops")
+    if not isinstance(ops, list) or not ops:
+        raise _PayloadError("batch requires a non-empty 'ops' list")
+    prepared = []
+    for index, op in enumerate(ops):
+        if not isinstance(op, dict):
+            raise _PayloadError(f"ops[{index}] must be an object")
+        op_action = normalize_action(str(op.get("action") or ""))
+        write = _WRITES.get(op_action)
+        if write is None:
+            if op_action in _HANDLERS:
+                raise _PayloadError(f"ops[{index}]: action '{op_action}' cannot be batched")
+            raise _PayloadError(f"ops[{index}]: unknown action '{op_action}'. Allowed: {_ALLOWED_STR}")
+        try:
+            prepared.append(write[1](op))
+        except _PayloadError as exc:
+            raise _PayloadError(f"ops[{index}]: {exc}") from exc
+    return prepared
+
+
+def _handle_batch(payload: dict[str, Any]) -> list[types.TextContent]:
+    ops = _prepare_batch(payload)
+    results = batch_apply(ops)
+    # the server keeps only the latest mutation, so the whole batch is recorded once, under its last model
+    note_model_mutation("archimate_model_cud", "batch", ops[-1][1]["model_id"])
+    return _text(dumps_json({"status": "ok", "count": len(results), "results": results}))
+
+
+# action -> handler(payload), aliases included; insertion order is the order reported for an unknown action
+_HANDLERS: dict[str, Callable[[dict[str, Any]], list[types.TextContent]]] = {"db_info": _handle_db_info}
+for _action in (
+    "create_element",
+    "update_element",
+    "delete_element",
+    "create_el",
+    "update_el",
+    "delete_el",
+    "create_relationship",
+    "update_relationship",
+    "delete_relationship",
+    "create_rel",
+    "update_rel",
+    "delete_rel",
+    "add_tag",
+    "remove_tag",
+):
+    _HANDLERS[_action] = _write_handler(_action)
+_HANDLERS["batch"] = _handle_batch
+# joined once for the unknown-action error
+_ALLOWED_STR = ", ".join(_HANDLERS)
+
+
+def _dispatch(action: str, payload: dict[str, Any]) -> list[types.TextContent]:
+    """Run one action on an already-decoded payload; shared by both tool entry points."""
+    action = normalize_action(action)
+    handler = _HANDLERS.get(action)
+    if handler is None:
+        return _error(f"unknown action '{action}'. Allowed: {_ALLOWED_STR}")
+    try:
+        return handler(payload)
+    except Exception as exc:
+        return _error(str(exc))
 
 
 @mcp.tool()
@@ -35,207 +279,23 @@ def archimate_model_cud(action: str, payload_json: str = "{}") -> list[types.Tex
       - create_rel/update_rel/delete_rel (short aliases)
       - add_tag: {model_id, key, value?, element_id? | relationship_id?}
       - remove_tag: {model_id, key, element_id? | relationship_id?}
+      - batch: {ops: [{action, ...fields of that action}, ...]} – all ops commit together or not at all
 
     Tag actions require the key to be defined with is_tag=true in the
     archimate_attribute_dictionary before use.
     """
-    action = (action or "").strip().lower()
-    action_aliases = {
-        "create_el": "create_element",
-        "update_el": "update_element",
-        "delete_el": "delete_element",
-        "create_rel": "create_relationship",
-        "update_rel": "update_relationship",
-        "delete_rel": "delete_relationship",
-    }
-    action = action_aliases.get(action, action)
     try:
-        payload: dict[str, Any] = json.loads(payload_json) if payload_json else {}
-    except json.JSONDecodeError as exc:
-        return [types.TextContent(type="text", text=f"Error: payload_json is invalid JSON – {exc}")]
+        payload: dict[str, Any] = loads_json(payload_json) if payload_json else {}
+    except ValueError as exc:
+        return _error(f"payload_json is invalid JSON – {exc}")
+    return _dispatch(action, payload)
 
-    try:
-        if action == "db_info":
-            result = {
-                "metamodel_db": {
-                    "path": str(METAMODEL_DB_PATH),
-                    "exists": METAMODEL_DB_PATH.exists(),
-                },
-                "model_db": {
-                    "path": str(MODEL_DB_PATH),
-                    "exists": MODEL_DB_PATH.exists(),
-                },
-            }
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        if action in {"create_element", "update_element"}:
-            for key in ("model_id", "type_name", "name"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            if action == "update_element" and not payload.get("element_id"):
-                return [types.TextContent(type="text", text="Error: update_element requires 'element_id'")]
-
-            result = upsert_model_element(
-                model_id=str(payload["model_id"]),
-                type_name=str(payload["type_name"]),
-                name=str(payload["name"]),
-                element_id=str(payload["element_id"]) if payload.get("element_id") else None,
-                attributes=payload.get("attributes") if isinstance(payload.get("attributes"), dict) else None,
-                valid_from=str(payload.get("valid_from")) if payload.get("valid_from") is not None else None,
-                valid_to=str(payload.get("valid_to")) if payload.get("valid_to") is not None else None,
-                expected_version=int(payload["expected_version"]) if payload.get("expected_version") is not None else None,
-                author=str(payload.get("author", "system")),
-                message=str(payload.get("message", "Element upserted")),
-            )
-            note_model_mutation("archimate_model_cud", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        if action == "delete_element":
-            for key in ("model_id", "element_id"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            result = delete_model_element(
-                model_id=str(payload["model_id"]),
-                element_id=str(payload["element_id"]),
-                expected_version=int(payload["expected_version"]) if payload.get("expected_version") is not None else None,
-                author=str(payload.get("author", "system")),
-                message=str(payload.get("message", "Element deleted")),
-            )
-            note_model_mutation("archimate_model_cud", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        if action in {"create_relationship", "update_relationship"}:
-            for key in ("model_id", "type_name", "source_element_id", "target_element_id"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            if action == "update_relationship" and not payload.get("relationship_id"):
-                return [types.TextContent(type="text", text="Error: update_relationship requires 'relationship_id'")]
-
-            result = upsert_model_relationship(
-                model_id=str(payload["model_id"]),
-                type_name=str(payload["type_name"]),
-                source_element_id=str(payload["source_element_id"]),
-                target_element_id=str(payload["target_element_id"]),
-                relationship_id=str(payload["relationship_id"]) if payload.get("relationship_id") else None,
-                name=str(payload.get("name", "")),
-                attributes=payload.get("attributes") if isinstance(payload.get("attributes"), dict) else None,
-                valid_from=str(payload.get("valid_from")) if payload.get("valid_from") is not None else None,
-                valid_to=str(payload.get("valid_to")) if payload.get("valid_to") is not None else None,
-                expected_version=int(payload["expected_version"]) if payload.get("expected_version") is not None else None,
-                author=str(payload.get("author", "system")),
-                message=str(payload.get("message", "Relationship upserted")),
-            )
-            note_model_mutation("archimate_model_cud", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        if action == "delete_relationship":
-            for key in ("model_id", "relationship_id"):
-                if not payload.get(key):
-                    return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
-            result = delete_model_relationship(
-                model_id=str(payload["model_id"]),
-                relationship_id=str(payload["relationship_id"]),
-                expected_version=int(payload["expected_version"]) if payload.get("expected_version") is not None else None,
-                author=str(payload.get("author", "system")),
-                message=str(payload.get("message", "Relationship deleted")),
-            )
-            note_model_mutation("archimate_model_cud", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        if action == "add_tag":
-            if not payload.get("model_id"):
-                return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
-            if not payload.get("key"):
-                return [types.TextContent(type="text", text="Error: missing required field 'key'")]
-            has_element = bool(payload.get("element_id"))
-            has_relationship = bool(payload.get("relationship_id"))
-            if not has_element and not has_relationship:
-                return [types.TextContent(type="text", text="Error: add_tag requires 'element_id' or 'relationship_id'")]
-            if has_element and has_relationship:
-                return [types.TextContent(type="text", text="Error: add_tag accepts either 'element_id' or 'relationship_id', not both")]
-
-            model_id = str(payload["model_id"])
-            key = str(payload["key"])
-            value = str(payload.get("value", ""))
-            author = str(payload.get("author", "system"))
-            message = str(payload.get("message", "Tag added"))
-
-            if has_element:
-                result = add_element_tag(
-                    model_id=model_id,
-                    element_id=str(payload["element_id"]),
-                    key=key,
-                    value=value,
-                    author=author,
-                    message=message,
-                )
-            else:
-                result = add_relationship_tag(
-                    model_id=model_id,
-                    relationship_id=str(payload["relationship_id"]),
-                    key=key,
-                    value=value,
-                    author=author,
-                    message=message,
-                )
-            note_model_mutation("archimate_model_cud", action, model_id)
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        if action == "remove_tag":
-            if not payload.get("model_id"):
-                return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
-            if not payload.get("key"):
-                return [types.TextContent(type="text", text="Error: missing required field 'key'")]
-            has_element = bool(payload.get("element_id"))
-            has_relationship = bool(payload.get("relationship_id"))
-            if not has_element and not has_relationship:
-                return [types.TextContent(type="text", text="Error: remove_tag requires 'element_id' or 'relationship_id'")]
-            if has_element and has_relationship:
-                return [types.TextContent(type="text", text="Error: remove_tag accepts either 'element_id' or 'relationship_id', not both")]
-
-            model_id = str(payload["model_id"])
-            key = str(payload["key"])
-            author = str(payload.get("author", "system"))
-            message = str(payload.get("message", "Tag removed"))
-
-            if has_element:
-                result = remove_element_tag(
-                    model_id=model_id,
-                    element_id=str(payload["element_id"]),
-                    key=key,
-                    author=author,
-                    message=message,
-                )
-            else:
-                result = remove_relationship_tag(
-                    model_id=model_id,
-                    relationship_id=str(payload["relationship_id"]),
-                    key=key,
-                    author=author,
-                    message=message,
-                )
-            note_model_mutation("archimate_model_cud", action, model_id)
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-
-        allowed = [
-            "db_info",
-            "create_element",
-            "update_element",
-            "delete_element",
-            "create_el",
-            "update_el",
-            "delete_el",
-            "create_relationship",
-            "update_relationship",
-            "delete_relationship",
-            "create_rel",
-            "update_rel",
-            "delete_rel",
-            "add_tag",
-            "remove_tag",
-        ]
-        return [types.TextContent(type="text", text=f"Error: unknown action '{action}'. Allowed: {', '.join(allowed)}")]
-    except ModelError as exc:
-        return [types.TextContent(type="text", text=f"Error: {exc}")]
-    except Exception as exc:
-        return [types.TextContent(type="text", text=f"Error: {exc}")]
+
+@mcp.tool()
+def archimate_model_cud_fast(action: str, payload: dict[str, Any] | None = None) -> list[types.TextContent]:
+    """Same actions and payload fields as archimate_model_cud, with the payload passed as a JSON object.
+
+    Use this variant when the client can send structured arguments; the payload is not
+    re-encoded into a string and parsed again.
+    """
+    return _dispatch(action, payload or {})
@@ -7,9 +7,7 @@ from typing import Any
 
 from mcp import types
 
-from ...db import DB_PATH as METAMODEL_DB_PATH
 from ...model_db import (
-    MODEL_DB_PATH,
     ModelError,
     acquire_lock,
     create_model,
@@ -37,7 +35,7 @@ from ...model_db import (
     upsert_model_relationship,
     validate_model,
 )
-from ...server import mcp, note_model_mutation
+from ...server import db_info_json, dumps_json, loads_json, mcp, note_model_mutation
 
 
 @mcp.tool()
@@ -58,7 +56,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
     action = (action or "").strip().lower()
 
     try:
-        payload: dict[str, Any] = json.loads(payload_json) if payload_json else {}
+        payload: dict[str, Any] = loads_json(payload_json) if payload_json else {}
     except json.JSONDecodeError as exc:
         return [types.TextContent(type="text", text=f"Error: payload_json is invalid JSON – {exc}")]
 
@@ -71,17 +69,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
 
     try:
         if action == "db_info":
-            result = {
-                "metamodel_db": {
-                    "path": str(METAMODEL_DB_PATH),
-                    "exists": METAMODEL_DB_PATH.exists(),
-                },
-                "model_db": {
-                    "path": str(MODEL_DB_PATH),
-                    "exists": MODEL_DB_PATH.exists(),
-                },
-            }
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=db_info_json())]
 
         if action == "create_model":
             if not payload.get("name"):
@@ -97,14 +85,14 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
             from ...server import set_current_model
             set_current_model(result.get("id"))
             note_model_mutation("archimate_model_management", action, str(result.get("id")))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "list_models":
             result = list_models(
                 limit=int(payload.get("limit", 100)),
                 search=str(payload.get("search")) if payload.get("search") is not None else None,
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "get_model":
             if not payload.get("model_id"):
@@ -113,7 +101,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 model_id=str(payload["model_id"]),
                 include_graph=bool(payload.get("include_graph", True)),
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "update_model":
             if not payload.get("model_id"):
@@ -128,14 +116,14 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 message=str(payload.get("message", "Model updated")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "delete_model":
             if not payload.get("model_id"):
                 return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
             deleted = delete_model(model_id=str(payload["model_id"]))
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps({"status": "deleted", "count": deleted}, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json({"status": "deleted", "count": deleted}))]
 
         if action == "define_attribute":
             for key in ("model_id", "target_type", "key"):
@@ -148,7 +136,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 key=str(payload["key"]),
                 description=str(payload.get("description", "")),
             )
-            return [types.TextContent(type="text", text=json.dumps({"status": "ok"}, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json({"status": "ok"}))]
 
         if action == "list_attributes":
             for key in ("model_id", "target_type"):
@@ -159,7 +147,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 model_id=str(payload["model_id"]),
                 target_type=str(payload["target_type"]),
             )
-            return [types.TextContent(type="text", text=json.dumps(attrs, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(attrs))]
 
         if action == "delete_attribute":
             for key in ("model_id", "target_type", "key"):
@@ -171,7 +159,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 target_type=str(payload["target_type"]),
                 key=str(payload["key"]),
             )
-            return [types.TextContent(type="text", text=json.dumps({"deleted": count}, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json({"deleted": count}))]
 
         if action == "upsert_element":
             for key in ("model_id", "type_name", "name"):
@@ -190,7 +178,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 message=str(payload.get("message", "Element upserted")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "list_elements":
             if not payload.get("model_id"):
@@ -201,8 +189,10 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 search=str(payload.get("search")) if payload.get("search") is not None else None,
                 valid_at=str(payload.get("valid_at")) if payload.get("valid_at") is not None else None,
                 limit=int(payload.get("limit", 200)),
+                attribute_key=str(payload.get("attribute_key")) if payload.get("attribute_key") else None,
+                attribute_value=payload.get("attribute_value"),
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "delete_element":
             for key in ("model_id", "element_id"):
@@ -216,7 +206,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 message=str(payload.get("message", "Element deleted")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "upsert_relationship":
             for key in ("model_id", "type_name", "source_element_id", "target_element_id"):
@@ -237,7 +227,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 message=str(payload.get("message", "Relationship upserted")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "list_relationships":
             if not payload.get("model_id"):
@@ -250,7 +240,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 valid_at=str(payload.get("valid_at")) if payload.get("valid_at") is not None else None,
                 limit=int(payload.get("limit", 200)),
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "delete_relationship":
             for key in ("model_id", "relationship_id"):
@@ -264,7 +254,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 message=str(payload.get("message", "Relationship deleted")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "list_versions":
             if not payload.get("model_id"):
@@ -273,14 +263,14 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 model_id=str(payload["model_id"]),
                 limit=int(payload.get("limit", 100)),
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "get_version":
             for key in ("model_id", "version"):
                 if payload.get(key) is None:
                     return [types.TextContent(type="text", text=f"Error: missing required field '{key}'")]
             result = get_version(model_id=str(payload["model_id"]), version=int(payload["version"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "revert_version":
             for key in ("model_id", "version"):
@@ -293,25 +283,25 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 author=str(payload.get("author", "system")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "validate_model":
             if not payload.get("model_id"):
                 return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
             result = validate_model(model_id=str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "generate_report":
             if not payload.get("model_id"):
                 return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
             result = generate_report(model_id=str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "generate_insights":
             if not payload.get("model_id"):
                 return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
             result = generate_insights(model_id=str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "generate_view_mermaid":
             if not payload.get("model_id"):
@@ -324,7 +314,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                     limit=int(payload.get("limit", 300)),
                 ),
             }
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "export_csv":
             if not payload.get("model_id"):
@@ -333,7 +323,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 model_id=str(payload["model_id"]),
                 filename_prefix=str(payload.get("filename_prefix")) if payload.get("filename_prefix") is not None else None,
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "import_csv":
             for key in ("model_id", "elements_csv", "relationships_csv"):
@@ -348,13 +338,13 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 author=str(payload.get("author", "system")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "export_xml":
             if not payload.get("model_id"):
                 return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
             xml_content = export_model_xml(model_id=str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps({"model_id": str(payload["model_id"]), "xml": xml_content}, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json({"model_id": str(payload["model_id"]), "xml": xml_content}))]
 
         if action == "import_xml":
             for key in ("model_id", "xml"):
@@ -368,7 +358,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 author=str(payload.get("author", "system")),
             )
             note_model_mutation("archimate_model_management", action, str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "acquire_lock":
             for key in ("model_id", "owner"):
@@ -379,7 +369,7 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 owner=str(payload["owner"]),
                 force=bool(payload.get("force", False)),
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "release_lock":
             if not payload.get("model_id"):
@@ -389,13 +379,13 @@ def archimate_model_management(action: str, payload_json: str = "{}") -> list[ty
                 owner=str(payload.get("owner")) if payload.get("owner") is not None else None,
                 force=bool(payload.get("force", False)),
             )
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         if action == "get_lock":
             if not payload.get("model_id"):
                 return [types.TextContent(type="text", text="Error: missing required field 'model_id'")]
             result = get_lock(model_id=str(payload["model_id"]))
-            return [types.TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [types.TextContent(type="text", text=dumps_json(result))]
 
         allowed = [
             "db_info",
@@ -9,8 +9,8 @@ from typing import Any
 from mcp import types
 
 from ...db import DB_PATH as METAMODEL_DB_PATH
-from ...model_db import MODEL_DB_PATH, ModelError, get_connection
-from ...server import mcp
+from ...model_db import ModelError, get_connection
+from ...server import db_info_json, loads_json, mcp
 
 
 def _model_exists(model_id: str) -> bool:
@@ -28,7 +28,7 @@ def _row_dicts(cursor) -> list[dict[str, Any]]:
         for json_key in ("attributes_json", "tags_json"):
             if json_key in data and isinstance(data[json_key], str):
                 try:
-                    data[json_key.replace("_json", "")] = json.loads(data[json_key])
+                    data[json_key.replace("_json", "")] = loads_json(data[json_key])
                 except json.JSONDecodeError:
                     data[json_key.replace("_json", "")] = {}
                 del data[json_key]
@@ -62,7 +62,7 @@ def _search_elements(
         sql = (
             "SELECT me.*, e.layer AS metamodel_layer, e.aspect AS metamodel_aspect "
             "FROM model_elements me "
-            "LEFT JOIN metamodel.elements e ON lower(e.name) = lower(me.type_name) "
+            "LEFT JOIN metamodel.elements e ON e.name = me.type_name "
             "WHERE me.model_id = ?"
         )
         params: list[Any] = [model_id]
@@ -122,7 +122,7 @@ def _search_relationships(
         base_sql = (
             "SELECT mr.*, r.category AS metamodel_category, r.directed AS metamodel_directed "
             "FROM model_relationships mr "
-            "LEFT JOIN metamodel.relationships r ON lower(r.name) = lower(mr.type_name) "
+            "LEFT JOIN metamodel.relationships r ON r.name = mr.type_name "
             "WHERE mr.model_id = ?"
         )
         params: list[Any] = [model_id]
@@ -277,24 +277,13 @@ def archimate_model_query(action: str, payload_json: str = "{}") -> list[types.T
     action = (action or "").strip().lower()
 
     try:
-        payload: dict[str, Any] = json.loads(payload_json) if payload_json else {}
+        payload: dict[str, Any] = loads_json(payload_json) if payload_json else {}
     except json.JSONDecodeError as exc:
         return [types.TextContent(type="text", text=f"Error: payload_json is invalid JSON – {exc}")]
 
     try:
         if action == "db_info":
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(
-                        {
-                            "metamodel_db": {"path": str(METAMODEL_DB_PATH), "exists": METAMODEL_DB_PATH.exists()},
-                            "model_db": {"path": str(MODEL_DB_PATH), "exists": MODEL_DB_PATH.exists()},
-                        },
-                        ensure_ascii=False,
-                    ),
-                )
-            ]
+            return [types.TextContent(type="text", text=db_info_json())]
 
         model_id = str(payload.get("model_id", "")).strip()
         if not model_id:
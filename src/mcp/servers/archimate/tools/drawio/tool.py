@@ -21,7 +21,7 @@ from typing import Any
 
 from mcp import types
 
-from ...server import clear_recent_model_mutation, get_recent_model_mutation, mcp
+from ...server import clear_recent_model_mutation, get_recent_model_mutation, loads_json, mcp
 
 
 STATIC_STYLESHEET_FILENAME = "styles.css"
@@ -136,7 +136,7 @@ def _maybe_parse_json_string(value: Any) -> Any:
     if not candidate or candidate[0] not in "[{":
         return value
     try:
-        return json.loads(candidate)
+        return loads_json(candidate)
     except json.JSONDecodeError:
         return value
 
@@ -504,12 +504,12 @@ def drawio(
         ]
 
     try:
-        entities_raw = json.loads(entities_json)
+        entities_raw = loads_json(entities_json)
     except json.JSONDecodeError as exc:
         return [types.TextContent(type="text", text=f"Error: entities_json invalid JSON – {exc}")]
 
     try:
-        relationships_raw = json.loads(relationships_json) if relationships_json else []
+        relationships_raw = loads_json(relationships_json) if relationships_json else []
     except json.JSONDecodeError as exc:
         return [types.TextContent(type="text", text=f"Error: relationships_json invalid JSON – {exc}")]
 
@@ -3,7 +3,7 @@
 import json
 from mcp import types
 
-from ...server import mcp
+from ...server import loads_json, mcp
 from ...server import MATRIX_VIEW_URI
 
 
@@ -28,7 +28,7 @@ def selectable_matrix(
         column_field: Entity field used for matrix columns.
     """
     try:
-        entities = json.loads(entities_json)
+        entities = loads_json(entities_json)
     except json.JSONDecodeError as e:
         return [types.TextContent(type="text", text=f"Error: Invalid JSON – {e}")]
 
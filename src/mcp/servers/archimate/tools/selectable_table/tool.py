@@ -7,7 +7,7 @@ shares the same MCP instance and resources.
 import json
 from mcp import types
 
-from ...server import mcp
+from ...server import loads_json, mcp
 from ...server import VIEW_URI
 
 
@@ -28,7 +28,7 @@ def selectable_table(
         entities_json: A JSON string containing an array of entity objects.
     """
     try:
-        entities = json.loads(entities_json)
+        entities = loads_json(entities_json)
     except json.JSONDecodeError as e:
         return [types.TextContent(type="text", text=f"Error: Invalid JSON – {e}")]
 